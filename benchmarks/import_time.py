@@ -0,0 +1,71 @@
+""" Measures the cold import time of pygdal in fresh interpreters and the
+    overhead of calling a bound function once the library is loaded,
+    compared to calling it directly through ctypes.
+
+    Usage: python benchmarks/import_time.py [runs] [module]
+"""
+
+import subprocess
+import sys
+
+
+SCRIPT = """
+import time
+start = time.time()
+import %s
+print(time.time() - start)
+"""
+
+CALL_SCRIPT = """
+import ctypes
+import timeit
+import pygdal.gdal
+from pygdal.libgdal import _libgdal
+
+# loads the library, after which the bound functions are called
+pygdal.gdal.GDALGetCacheMax64()
+bound = timeit.timeit(pygdal.gdal.GDALGetCacheMax64, number=%d)
+
+direct = ctypes.CDLL(_libgdal._name).GDALGetCacheMax64
+direct.restype = ctypes.c_longlong
+raw = timeit.timeit(direct, number=%d)
+print(bound / %d, raw / %d)
+"""
+
+
+def measure(module, runs):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", SCRIPT % module]
+        )
+        timings.append(float(output.decode().strip()))
+    return sorted(timings)
+
+
+def measure_call(number=1000000):
+    output = subprocess.check_output(
+        [sys.executable, "-c", CALL_SCRIPT % ((number,) * 4)]
+    )
+    bound, raw = output.decode().split()
+    return float(bound), float(raw)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    module = sys.argv[2] if len(sys.argv) > 2 else "pygdal.gdal"
+
+    timings = measure(module, runs)
+    print("import %s (%d runs)" % (module, runs))
+    print("  min:    %.2f ms" % (timings[0] * 1000))
+    print("  median: %.2f ms" % (timings[len(timings) // 2] * 1000))
+    print("  max:    %.2f ms" % (timings[-1] * 1000))
+
+    bound, raw = measure_call()
+    print("call GDALGetCacheMax64")
+    print("  pygdal: %.0f ns" % (bound * 1e9))
+    print("  ctypes: %.0f ns" % (raw * 1e9))
+
+
+if __name__ == "__main__":
+    main()
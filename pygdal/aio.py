@@ -0,0 +1,111 @@
+""" asyncio support, offloading the blocking reads to threads.
+"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import threading
+import weakref
+
+from pygdal.gdal import Band
+from pygdal.libgdal import GDALGetBandDataset
+
+
+class RasterExecutor(object):
+    """ Runs blocking reads in a fixed number of single threaded lanes. All
+        reads of a dataset and its bands run in the same lane, so a handle is
+        never used concurrently, while reads of different datasets run in
+        parallel. At most `max_pending` reads per event loop are submitted
+        at once, further reads wait for a free slot. The executor can be
+        shared by several event loops, e.g. in different threads.
+    """
+
+    def __init__(self, lanes=4, max_pending=64):
+        self._lanes = [ThreadPoolExecutor(max_workers=1) for _ in range(lanes)]
+        self._max_pending = max_pending
+        # the limit applies per event loop, as semaphores are bound to one
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _lane(self, raster):
+        if isinstance(raster, Band):
+            handle = GDALGetBandDataset(raster)
+        else:
+            handle = raster._handle
+        # pointers are aligned, so their bits are mixed by a multiplicative
+        # hash before picking the lane
+        mixed = ((handle or 0) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return self._lanes[(mixed >> 32) % len(self._lanes)]
+
+    def _pending(self, loop):
+        with self._lock:
+            try:
+                return self._semaphores[loop]
+            except KeyError:
+                semaphore = asyncio.Semaphore(self._max_pending)
+                self._semaphores[loop] = semaphore
+                return semaphore
+
+    async def read(self, raster, *args, **kwargs):
+        """ Reads from the band or dataset without blocking the event loop.
+            The arguments are the ones of its `read` method.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._pending(loop):
+            return await loop.run_in_executor(
+                self._lane(raster), partial(raster.read, *args, **kwargs)
+            )
+
+    async def iter_windows(self, raster, windows, prefetch=2, **kwargs):
+        """ Asynchronously iterates over the windows and yields
+            (window, array) tuples in order. Up to `prefetch` windows are
+            read ahead. Reads not yet started are cancelled when the
+            iteration is stopped or cancelled.
+        """
+        windows = list(windows)
+        pending = deque()
+        index = 0
+        try:
+            while index < len(windows) or pending:
+                while index < len(windows) and len(pending) <= prefetch:
+                    window = windows[index]
+                    pending.append((window, asyncio.ensure_future(
+                        self.read(raster, *window, **kwargs)
+                    )))
+                    index += 1
+
+                window, future = pending.popleft()
+                yield window, await future
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def shutdown(self, wait=True):
+        for lane in self._lanes:
+            lane.shutdown(wait)
+
+
+_default_executor = None
+
+
+def get_executor():
+    """ Returns the executor used by default, created on first use.
+    """
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = RasterExecutor()
+    return _default_executor
+
+
+def read(raster, *args, **kwargs):
+    """ Coroutine reading from the band or dataset in the default executor.
+    """
+    return get_executor().read(raster, *args, **kwargs)
+
+
+def iter_windows(raster, windows, prefetch=2, **kwargs):
+    """ Asynchronously iterates over the windows of the band or dataset using
+        the default executor, see `RasterExecutor.iter_windows`.
+    """
+    return get_executor().iter_windows(raster, windows, prefetch, **kwargs)
@@ -0,0 +1,57 @@
+""" Control over the global GDAL raster block cache.
+"""
+
+from contextlib import contextmanager
+
+from pygdal.libgdal import (
+    GDALSetCacheMax64, GDALGetCacheMax64, GDALGetCacheUsed64,
+    GDALFlushCacheBlock
+)
+
+
+def get_max():
+    """ Returns the maximum size of the block cache in bytes.
+    """
+    return GDALGetCacheMax64()
+
+
+def set_max(size):
+    """ Sets the maximum size of the block cache in bytes. Blocks exceeding
+        the new size are flushed.
+    """
+    GDALSetCacheMax64(int(size))
+
+
+def get_used():
+    """ Returns the number of bytes currently used by the block cache.
+    """
+    return GDALGetCacheUsed64()
+
+
+def flush():
+    """ Flushes all blocks from the cache and returns their number. Dirty
+        blocks are written before being discarded.
+    """
+    count = 0
+    while GDALFlushCacheBlock():
+        count += 1
+    return count
+
+
+def stats():
+    """ Returns a dict with the maximum and used size of the cache in bytes.
+    """
+    return {"max": get_max(), "used": get_used()}
+
+
+@contextmanager
+def cache_max(size):
+    """ Context manager to temporarily set the maximum size of the block
+        cache. The previous size is restored on exit.
+    """
+    previous = get_max()
+    set_max(size)
+    try:
+        yield
+    finally:
+        set_max(previous)
@@ -0,0 +1,185 @@
+""" Writing and validation of cloud optimized GeoTIFFs: tiled and compressed
+    GeoTIFFs with internal overviews, laid out for HTTP range reads.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from pygdal.gdal import Dataset, Driver, config_options, _data_type
+
+
+def auto_overview_levels(size_x, size_y, blocksize=512):
+    """ Returns the decimation levels [2, 4, ...] until the smallest overview
+        fits into a single block.
+    """
+    levels = []
+    level = 1
+    while max(size_x, size_y) > blocksize * level:
+        level *= 2
+        levels.append(level)
+    return levels
+
+
+def _intermediate(source, in_memory, tempdir, geotransform, projection):
+    # copies the source into a dataset to build the overviews in, either in
+    # memory or as a temporary tiled GeoTIFF
+    if in_memory:
+        driver, path, options = Driver.by_name("MEM"), "", None
+    else:
+        driver = Driver.by_name("GTiff")
+        path = os.path.join(tempdir, "intermediate.tif")
+        options = {"TILED": True, "BIGTIFF": "IF_SAFER"}
+
+    if isinstance(source, Dataset):
+        return driver.create_copy(path, source, options=options)
+
+    data = np.asarray(source)
+    if data.ndim == 2:
+        data = data[np.newaxis]
+    elif data.ndim != 3:
+        raise ValueError("Expected an array of two or three dimensions.")
+
+    count, size_y, size_x = data.shape
+    dataset = driver.create(
+        path, size_x, size_y, count, _data_type(data.dtype), options
+    )
+    if geotransform is not None:
+        dataset.geotransform = geotransform
+    if projection is not None:
+        dataset.projection = projection
+    dataset.write(data)
+    return dataset
+
+
+def write(source, path, blocksize=512, compression="DEFLATE",
+          overview_levels=None, resampling="average", workers=None,
+          in_memory=True, geotransform=None, projection=None, options=None,
+          progress=None):
+    """ Writes the `source` dataset or array as cloud optimized GeoTIFF to
+        `path`. Arrays are shaped (rows, cols) or (bands, rows, cols) and
+        can be georeferenced with `geotransform` and `projection`.
+
+        The source is copied to an intermediate dataset, in memory or, if
+        `in_memory` is False, as a temporary GeoTIFF, where the overviews
+        with the given decimation `overview_levels` are built. Without
+        levels, overviews are added until the smallest fits into a single
+        block. The output is then created as a copy of the intermediate with
+        tiles of `blocksize` pixels, the given `compression` and the
+        overviews stored before the full resolution data. With `workers`,
+        the overviews are built and the tiles compressed in that many
+        threads. Further creation `options` are passed to the GeoTIFF
+        driver and `progress` is called during the final copy as with
+        `Driver.create_copy`.
+
+        The layout of the written file is checked with `validate`.
+    """
+    tempdir = None if in_memory else tempfile.mkdtemp(suffix=".cog")
+    try:
+        with _intermediate(source, in_memory, tempdir, geotransform,
+                           projection) as intermediate:
+            levels = overview_levels
+            if levels is None:
+                levels = auto_overview_levels(
+                    intermediate.size_x, intermediate.size_y, blocksize
+                )
+            if levels:
+                intermediate.build_overviews(
+                    levels, resampling, workers=workers
+                )
+
+            creation_options = {
+                "TILED": True,
+                "BLOCKXSIZE": blocksize,
+                "BLOCKYSIZE": blocksize,
+                "COPY_SRC_OVERVIEWS": True,
+                "BIGTIFF": "IF_SAFER",
+            }
+            if compression:
+                creation_options["COMPRESS"] = compression
+            if workers:
+                creation_options["NUM_THREADS"] = workers
+            creation_options.update(options or {})
+
+            with config_options(GDAL_TIFF_OVR_BLOCKSIZE=str(blocksize)):
+                output = Driver.by_name("GTiff").create_copy(
+                    path, intermediate, options=creation_options,
+                    progress=progress
+                )
+                output._close()
+    finally:
+        if tempdir is not None:
+            shutil.rmtree(tempdir, ignore_errors=True)
+
+    validate(path, blocksize, len(levels))
+
+
+def _offset(band, name):
+    value = band.metadata_item(name, "TIFF")
+    return int(value) if value else 0
+
+
+def validate(path, blocksize=None, overview_count=None):
+    """ Checks that the file at `path` is a cloud optimized GeoTIFF: images
+        larger than a block are tiled and have overviews, the image file
+        directories are stored from the full resolution to the smallest
+        overview, and the data from the smallest overview to the full
+        resolution. Optionally the block size and the number of overviews
+        are checked as well. Raises a ValueError listing the problems found.
+    """
+    errors = []
+    with Dataset.open(path, shared=False) as dataset:
+        band = dataset.bands[1]
+        overviews = band.overviews
+        size_x, size_y = band.size_x, band.size_y
+        block_size_x, _ = band.block_size
+
+        if max(size_x, size_y) > 512:
+            if block_size_x == size_x and size_x > 512:
+                errors.append("The image is not tiled.")
+            if not overviews:
+                errors.append("The image has no overviews.")
+
+        if blocksize is not None:
+            for level in [band] + overviews:
+                if level.block_size != (blocksize, blocksize) and \
+                        max(level.size_x, level.size_y) > blocksize:
+                    errors.append(
+                        "The %dx%d level has blocks of %dx%d instead of %dx%d."
+                        % ((level.size_x, level.size_y) + level.block_size
+                           + (blocksize, blocksize))
+                    )
+
+        if overview_count is not None and len(overviews) != overview_count:
+            errors.append(
+                "The image has %d instead of %d overviews."
+                % (len(overviews), overview_count)
+            )
+
+        levels = [band] + overviews
+        ifd_offsets = [_offset(level, "IFD_OFFSET") for level in levels]
+        if ifd_offsets != sorted(ifd_offsets):
+            errors.append(
+                "The image file directories are not ordered from the full "
+                "resolution to the smallest overview."
+            )
+
+        # empty blocks have no offset
+        data_offsets = [
+            offset for offset in (
+                _offset(level, "BLOCK_OFFSET_0_0") for level in reversed(levels)
+            ) if offset
+        ]
+        if data_offsets != sorted(data_offsets):
+            errors.append(
+                "The data is not ordered from the smallest overview to the "
+                "full resolution."
+            )
+
+    if errors:
+        raise ValueError(
+            "'%s' is not a valid cloud optimized GeoTIFF: %s"
+            % (path, " ".join(errors))
+        )
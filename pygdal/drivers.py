@@ -0,0 +1,84 @@
+""" Registry of the GDAL drivers, allowing to keep only a selection of them
+    registered for a faster startup and faster identification when opening
+    datasets.
+"""
+
+import threading
+
+from pygdal import gdal
+from pygdal.gdal import Driver, register_drivers, _ensure_drivers
+from pygdal.libgdal import GDALGetDriverCount, GDALGetDriver
+
+
+# Driver wrappers by handle, drivers are never destroyed while registered
+_wrappers = {}
+# deregistered drivers by short name, so they can be restored
+_deregistered = {}
+_lock = threading.Lock()
+
+
+def _wrapper(handle):
+    try:
+        return _wrappers[handle]
+    except KeyError:
+        driver = _wrappers[handle] = Driver(handle)
+        return driver
+
+
+def count():
+    """ Returns the number of registered drivers.
+    """
+    _ensure_drivers()
+    return GDALGetDriverCount()
+
+
+def registered():
+    """ Returns a list of all registered drivers.
+    """
+    _ensure_drivers()
+    with _lock:
+        return [_wrapper(GDALGetDriver(i)) for i in range(GDALGetDriverCount())]
+
+
+def names():
+    """ Returns the short names of all registered drivers.
+    """
+    return [driver.short_name for driver in registered()]
+
+
+def get(name):
+    """ Returns the registered driver with the given short name or None.
+    """
+    for driver in registered():
+        if driver.short_name == name:
+            return driver
+    return None
+
+
+def keep_only(names):
+    """ Keeps only the drivers with the given short names registered, e.g.
+        ["GTiff", "MEM", "VRT"]. If no drivers were registered yet, only the
+        named ones are registered in the first place, which avoids the cost
+        of registering all drivers.
+    """
+    names = set(names)
+    if not gdal._drivers_registered:
+        register_drivers(sorted(names))
+        return
+
+    for driver in registered():
+        name = driver.short_name
+        if name not in names:
+            driver.deregister()
+            with _lock:
+                _deregistered[name] = driver
+
+
+def restore():
+    """ Registers all drivers again that were deregistered by `keep_only`.
+    """
+    with _lock:
+        drivers = list(_deregistered.values())
+        _deregistered.clear()
+    for driver in drivers:
+        driver.register()
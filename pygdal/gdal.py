@@ -1,25 +1,30 @@
-
-
 from weakref import ref
+from contextlib import contextmanager
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
-from pygdal.util import ManagedObject, Extent, Window
+from pygdal.util import (
+    ManagedObject, Extent, Window, GeoTransform, block_windows, cached
+)
 from pygdal.libgdal import *
+from pygdal.libgdal import _libgdal
 
 
 class Driver(ManagedObject):
     @property
     def short_name(self):
-        return GDALGetDriverShortName(self.handle)
+        return _decode(GDALGetDriverShortName(self))
 
     @property
     def long_name(self):
-        return GDALGetDriverLongName(self.handle)
+        return _decode(GDALGetDriverLongName(self))
 
     @property
     def help(self):
-        return GDALGetDriverHelpTopic(self.handle)
+        return _decode(GDALGetDriverHelpTopic(self))
 
 
     def open(self, identifier):
@@ -27,19 +32,41 @@ class Driver(ManagedObject):
         pass
 
     def create(self, identifier, size_x, size_y, num_bands=1, data_type=GDT_Byte, options=None):
-        # TODO: creation options
+        """ Creates a new dataset. The creation `options` are passed as a
+            dict, e.g. {"TILED": True, "COMPRESS": "DEFLATE"}, or a list of
+            (key, value) tuples or "KEY=VALUE" strings.
+        """
         dataset_h = GDALCreate(
-            self, identifier, size_x, size_y, num_bands, data_type, to_char_p_p(options)
+            self, _encode(identifier), size_x, size_y, num_bands, data_type,
+            to_char_p_p(options)
         )
         return Dataset(dataset_h)
 
+    def create_copy(self, identifier, source, strict=False, options=None,
+                    progress=None):
+        """ Creates a new dataset as a copy of the `source` dataset, using the
+            optimized copy of the driver. With `strict` the copy fails if it
+            cannot represent the source exactly. See `create` for the
+            `options`. A `progress(complete, message)` callable is called
+            during the copy, which is cancelled when it returns False.
+        """
+        dataset_h = GDALCreateCopy(
+            self, _encode(identifier), source, strict, to_char_p_p(options),
+            _progress_func(progress), None
+        )
+        return Dataset(dataset_h)
+
+    def register(self):
+        GDALRegisterDriver(self)
+
     def deregister(self):
         GDALDeregisterDriver(self)
 
 
     @classmethod
     def by_name(cls, name):
-        return cls(GDALGetDriverByName(name))
+        _ensure_drivers()
+        return cls(GDALGetDriverByName(_encode(name)))
 
     #@property
     #def creation_options(self):
@@ -60,7 +87,9 @@ class _BandsProxy(object):
         try:
             return self._band_cache[index]
         except KeyError:
-            band = Band(GDALGetRasterBand(self._dataset_ref(), index))
+            band = Band(
+                GDALGetRasterBand(self._dataset_ref(), index), self._dataset_ref
+            )
             self._band_cache[index] = band
             return band
 
@@ -72,6 +101,10 @@ class Dataset(ManagedObject):
     def __init__(self, *args, **kwargs):
         super(Dataset, self).__init__(*args, **kwargs)
         self._bandsproxy = _BandsProxy(ref(self))
+        self._open_args = None
+        # the number of live memory maps, which defer closing the handle
+        self._mappings = 0
+        self._deferred_handle = None
 
     @property
     def metadata(self):
@@ -80,11 +113,28 @@ class Dataset(ManagedObject):
         pass
 
     @property
+    def path(self):
+        """ The name the dataset was opened with, or its description.
+        """
+        if self._open_args:
+            return self._open_args[0]
+        return GDALGetDescription(self)
+
+    def metadata_item(self, name, domain=None):
+        """ The value of the metadata item in the given domain, or None.
+        """
+        return _decode(
+            GDALGetMetadataItem(self, _encode(name), _encode(domain))
+        )
+
+    @property
+    @cached
     def projection(self):
-        return GDALGetProjectionRef(self)
+        return _decode(GDALGetProjectionRef(self))
     @projection.setter
     def projection(self, value):
-        GDALSetProjection(self, value)
+        GDALSetProjection(self, _encode(value))
+        self._invalidate("projection")
     
 
     @property
@@ -92,10 +142,12 @@ class Dataset(ManagedObject):
         return (self.size_x, self.size_y)
 
     @property
+    @cached
     def size_x(self):
         return GDALGetRasterXSize(self)
 
     @property
+    @cached
     def size_y(self):
         return GDALGetRasterYSize(self)
 
@@ -107,32 +159,36 @@ class Dataset(ManagedObject):
         return self._bandsproxy[index]
 
     @property
+    @cached
     def geotransform(self):
         gt_arr = gdal_geotransform_type()
         GDALGetGeoTransform(self, gt_arr)
-        return tuple(gt_arr)
+        return GeoTransform(*gt_arr)
     @geotransform.setter
     def geotransform(self, value):
         gt_arr = gdal_geotransform_type(*value)
         GDALSetGeoTransform(self, gt_arr)
+        self._invalidate("geotransform", "extent")
     
     def transform_point(self, x, y):
-        out_x = c_double()
-        out_y = c_double()
-        GDALApplyGeoTransform(self.geotransform, x, y, byref(out_x), byref(out_y))
-        return out_x.value, out_y.value
+        out_x, out_y = self.geotransform.forward(x, y)
+        return float(out_x), float(out_y)
 
     @property
+    @cached
     def extent(self):
         return Extent.from_geotransform_and_size(self.geotransform, self.size)
 
     def to_window(self, minx, miny, maxx, maxy):
         """ Transforms a geospatial extent to a image window.
         """
+        return self.geotransform.window(minx, miny, maxx, maxy, self.size)
 
     def to_extent(self, offset_x, offset_y, size_x=None, size_y=None):
         """ Transforms the image window coordinates to a geospatial extent.
         """
+        window = _resolve_window(self, offset_x, offset_y, size_x, size_y)
+        return self.geotransform.extent(window)
 
     @property
     def gcps(self):
@@ -145,17 +201,408 @@ class Dataset(ManagedObject):
         self._gcps = value
 
 
-    def read(self, offset_x=0, offset_y=0, size_x=None, size_y=None, mask=False):
-        """ Read the data from the given window. The data is returned as a 
-            numpy array.
+    def _band_list(self, bands=None):
+        if bands is None:
+            return list(range(1, len(self.bands) + 1))
+        return list(bands)
+
+    def _get_numpy_array(self, window, bands, interleave="band", dtype=None,
+                         out_shape=None):
+        dtype = dtype or self.bands[bands[0]].dtype
+        rows, cols = out_shape or (window.size_y, window.size_x)
+        if interleave == "band":
+            shape = (len(bands), rows, cols)
+        elif interleave == "pixel":
+            shape = (rows, cols, len(bands))
+        else:
+            raise ValueError("Invalid interleave '%s'." % interleave)
+        return np.empty(shape, dtype=dtype)
+
+    def _raster_io(self, flag, window, array, bands, interleave, resampling=None):
+        count, buf_size_x, buf_size_y, pixel_space, line_space, band_space = \
+            _buffer_layout(array, interleave)
+
+        if count != len(bands):
+            raise ValueError(
+                "Array holds %d bands, but %d were requested."
+                % (count, len(bands))
+            )
+
+        if resampling is None:
+            GDALDatasetRasterIO(
+                self, flag, window.offset_x, window.offset_y,
+                window.size_x, window.size_y,
+                array.ctypes.data_as(c_void_p), buf_size_x, buf_size_y,
+                _data_type(array.dtype), len(bands), _band_map(bands),
+                pixel_space, line_space, band_space
+            )
+        else:
+            GDALDatasetRasterIOEx(
+                self, flag, window.offset_x, window.offset_y,
+                window.size_x, window.size_y,
+                array.ctypes.data_as(c_void_p), buf_size_x, buf_size_y,
+                _data_type(array.dtype), len(bands), _band_map(bands),
+                pixel_space, line_space, band_space,
+                byref(_extra_arg(resampling))
+            )
+
+    def read(self, offset_x=0, offset_y=0, size_x=None, size_y=None, mask=False,
+             bands=None, array=None, interleave="band", out_shape=None,
+             resampling=None):
+        """ Read the data from the given window of several bands in a single
+            call. The data is returned as a numpy array with the shape
+            (bands, rows, cols), or (rows, cols, bands) when `interleave` is
+            "pixel". A preallocated `array` of either layout can be passed to
+            be filled instead.
+
+            With an `out_shape` of (rows, cols) smaller than the window, the
+            data is read from the best fitting overview level and resampled
+            with the given `resampling` method.
+
+            With `mask` a `numpy.ma.MaskedArray` is returned, see
+            `Band.read`. A mask shared by all bands is only evaluated once.
         """
-        pass
+        window = _resolve_window(self, offset_x, offset_y, size_x, size_y)
+        bands = self._band_list(bands)
+
+        if mask:
+            data = self.read(
+                *window, bands=bands, array=array, interleave=interleave,
+                out_shape=out_shape, resampling=resampling
+            )
+            return self._masked(window, data, bands, interleave)
+
+        if array is None:
+            array = self._get_numpy_array(
+                window, bands, interleave, out_shape=out_shape
+            )
+
+        _, buf_size_x, buf_size_y, _, _, _ = _buffer_layout(array, interleave)
+        first = self.bands[bands[0]]
+        if (buf_size_x, buf_size_y) != (window.size_x, window.size_y) and \
+                first._select_overview(window, buf_size_x, buf_size_y)[0] is not first:
+            # overviews are bands without a dataset, so each band is read
+            # separately from its own overview into its view of the array
+            for i, index in enumerate(bands):
+                view = array[i] if interleave == "band" else array[..., i]
+                self.bands[index].read(
+                    *window, array=view, resampling=resampling
+                )
+        else:
+            self._raster_io(GF_Read, window, array, bands, interleave, resampling)
+        return array
 
-    def write(self, data, offset_x=0, offset_y=0, size_x=None, size_y=None):
+    def _masked(self, window, data, bands, interleave):
+        # wraps the data of the bands read from the window as a masked array
+        invalid = np.ma.nomask
+        per_dataset = None
+        for i, index in enumerate(bands):
+            band = self.bands[index]
+            flags = band.mask_flags
+            if flags & GMF_ALL_VALID:
+                continue
+
+            view = data[i] if interleave == "band" else data[..., i]
+            if flags & GMF_PER_DATASET:
+                # the mask is shared by all bands, so it is read only once
+                if per_dataset is None:
+                    per_dataset = band._valid(window, view, flags)
+                valid = per_dataset
+            else:
+                valid = band._valid(window, view, flags)
+            if valid is None:
+                continue
+
+            if invalid is np.ma.nomask:
+                invalid = np.zeros(data.shape, dtype=bool)
+            if interleave == "band":
+                invalid[i] = ~valid
+            else:
+                invalid[..., i] = ~valid
+        return np.ma.MaskedArray(data, mask=invalid)
+
+    def write(self, data, offset_x=0, offset_y=0, size_x=None, size_y=None,
+              bands=None, interleave="band"):
         """ Write the data from the given array into the dataset. Expected is
-            a numpy array.
+            a numpy array with the shape (bands, rows, cols), or
+            (rows, cols, bands) when `interleave` is "pixel". A two
+            dimensional array is written to a single band. Other sequences,
+            or arrays of types GDAL doesn't support, are converted to the
+            data type of the first band.
         """
-        pass
+        bands = self._band_list(bands)
+        data = _as_array(data, self.bands[bands[0]].dtype)
+        if data.ndim == 2:
+            data = data[np.newaxis] if interleave == "band" else data[..., np.newaxis]
+
+        _, buf_size_x, buf_size_y, _, _, _ = _buffer_layout(data, interleave)
+        window = _resolve_window(
+            self, offset_x, offset_y,
+            buf_size_x if size_x is None else size_x,
+            buf_size_y if size_y is None else size_y
+        )
+
+        self._raster_io(GF_Write, window, data, bands, interleave)
+        self._invalidate()
+        _invalidate_tiles(self._handle)
+
+    def advise_read(self, offset_x=0, offset_y=0, size_x=None, size_y=None,
+                    bands=None):
+        """ Advises the driver that the given window of the bands will be read
+            soon, so that it can start fetching the data asynchronously.
+        """
+        window = _resolve_window(self, offset_x, offset_y, size_x, size_y)
+        bands = self._band_list(bands)
+        GDALDatasetAdviseRead(
+            self, window.offset_x, window.offset_y, window.size_x, window.size_y,
+            window.size_x, window.size_y, self.bands[bands[0]].data_type,
+            len(bands), _band_map(bands), None
+        )
+
+    def iter_windows(self, windows, prefetch=2, bands=None, interleave="band"):
+        """ Reads the given windows one after another and yields
+            (window, array) tuples. While a window is being processed, the
+            next `prefetch` windows are already advised to the driver.
+        """
+        windows = [_resolve_window(self, *window) for window in windows]
+        bands = self._band_list(bands)
+
+        advised = 0
+        for index, window in enumerate(windows):
+            while advised < min(index + prefetch + 1, len(windows)):
+                self.advise_read(*windows[advised], bands=bands)
+                advised += 1
+            yield window, self.read(*window, bands=bands, interleave=interleave)
+
+    def sample(self, xs, ys, bands=None, crs_coords=True, masked=False):
+        """ Samples the values of the bands at the given points and returns
+            them as an array with the shape (points, bands). The coordinates
+            are georeferenced, or pixel/line coordinates if `crs_coords` is
+            not set. Each native block touched by the points is read once.
+            Points outside of the raster get the nodata value of the band, or
+            0 if it has none. The array has a data type holding the values of
+            all bands and their nodata values. If `masked` is set, a masked
+            array is returned, masking these points and nodata values.
+        """
+        bands = self._band_list(bands)
+        xs = np.asarray(xs, dtype=np.float64).ravel()
+        ys = np.asarray(ys, dtype=np.float64).ravel()
+        if crs_coords:
+            xs, ys = self.geotransform.inverse(xs, ys)
+
+        cols = np.floor(xs).astype(np.int64)
+        rows = np.floor(ys).astype(np.int64)
+        size_x, size_y = self.size
+        inside = (cols >= 0) & (cols < size_x) & (rows >= 0) & (rows < size_y)
+
+        first = self.bands[bands[0]]
+        nodata = [self.bands[index].nodata for index in bands]
+        dtype = np.result_type(*(
+            [self.bands[index].dtype for index in bands]
+            + [_value_dtype(value) for value in nodata if value is not None]
+        ))
+        if dtype.type not in DTYPE_TO_GDT:
+            # e.g. 64 bit integers, which GDAL cannot read into
+            dtype = np.dtype(np.float64)
+        out = np.empty((len(xs), len(bands)), dtype=dtype)
+        for i, value in enumerate(nodata):
+            out[~inside, i] = 0 if value is None else value
+
+        # group the points by the block containing them
+        block_size_x, block_size_y = first.block_size
+        blocks_per_row = -(-size_x // block_size_x)
+        points = np.nonzero(inside)[0]
+        keys = (
+            (rows[points] // block_size_y) * blocks_per_row
+            + cols[points] // block_size_x
+        )
+        order = np.argsort(keys, kind="mergesort")
+        keys, points = keys[order], points[order]
+        unique_keys, starts = np.unique(keys, return_index=True)
+        ends = np.append(starts[1:], len(keys))
+
+        buffer = np.empty((len(bands), block_size_y, block_size_x), dtype=dtype)
+        for key, start, end in zip(unique_keys, starts, ends):
+            block_y, block_x = divmod(int(key), blocks_per_row)
+            offset_x, offset_y = block_x * block_size_x, block_y * block_size_y
+            window = Window(
+                offset_x, offset_y,
+                min(block_size_x, size_x - offset_x),
+                min(block_size_y, size_y - offset_y)
+            )
+            data = self.read(
+                *window, bands=bands,
+                array=buffer[:, :window.size_y, :window.size_x]
+            )
+            block_points = points[start:end]
+            out[block_points] = data[
+                :, rows[block_points] - offset_y, cols[block_points] - offset_x
+            ].T
+
+        if not masked:
+            return out
+
+        mask = np.repeat(~inside[:, np.newaxis], len(bands), axis=1)
+        for i, value in enumerate(nodata):
+            if value is None:
+                continue
+            elif np.isnan(value):
+                mask[:, i] |= np.isnan(out[:, i])
+            else:
+                mask[:, i] |= out[:, i] == value
+        return np.ma.MaskedArray(out, mask)
+
+    def build_overviews(self, levels, resampling="nearest", bands=None,
+                        progress=None, workers=None):
+        """ Builds overviews with the given decimation `levels`, e.g.
+            [2, 4, 8], for all or the given bands. `progress` is called as
+            `progress(complete, message)` with the completed fraction and
+            cancels the operation when it returns False. With `workers`, the
+            overviews are computed in that many threads by GDAL.
+        """
+        levels = list(levels)
+        bands = self._band_list(bands)
+        callback = _progress_func(progress)
+
+        options = {"GDAL_NUM_THREADS": str(workers)} if workers else {}
+        with config_options(**options):
+            GDALBuildOverviews(
+                self, _encode(resampling.upper()),
+                len(levels), (c_int * len(levels))(*levels),
+                len(bands), _band_map(bands), callback, None
+            )
+
+    def as_memmap(self, offset_x=0, offset_y=0, size_x=None, size_y=None,
+                  bands=None, interleave="band", write=False, dtype=None,
+                  tile_size=None, cache_size=64 * 1024 * 1024,
+                  page_size_hint=0, single_thread=False):
+        """ Returns a numpy array mapping the given window of the bands into
+            virtual memory. The data is only read when pages of the array are
+            accessed. The array is shaped (bands, rows, cols), or
+            (rows, cols, bands) when `interleave` is "pixel". With a
+            `tile_size` of (tile_size_x, tile_size_y) the memory is organized
+            in tiles instead, and the array is shaped
+            (tiles_y, tiles_x, bands, tile_size_y, tile_size_x) or
+            (tiles_y, tiles_x, tile_size_y, tile_size_x, bands). The array
+            keeps the dataset open, even past `close`, until it is freed.
+        """
+        window = _resolve_window(self, offset_x, offset_y, size_x, size_y)
+        bands = self._band_list(bands)
+        dtype = np.dtype(dtype or self.bands[bands[0]].dtype)
+        flag = GF_Write if write else GF_Read
+        count = len(bands)
+
+        if interleave not in ("band", "pixel"):
+            raise ValueError("Invalid interleave '%s'." % interleave)
+
+        if tile_size is not None:
+            tile_size_x, tile_size_y = tile_size
+            handle = GDALDatasetGetTiledVirtualMem(
+                self, flag, window.offset_x, window.offset_y,
+                window.size_x, window.size_y, tile_size_x, tile_size_y,
+                _data_type(dtype), count, _band_map(bands),
+                GTO_BSQ if interleave == "band" else GTO_TIP,
+                cache_size, single_thread, None
+            )
+            tiles = (
+                -(-window.size_y // tile_size_y), -(-window.size_x // tile_size_x)
+            )
+            if interleave == "band":
+                shape = tiles + (count, tile_size_y, tile_size_x)
+            else:
+                shape = tiles + (tile_size_y, tile_size_x, count)
+            return _virtual_mem_array(handle, self, shape, None, dtype, write)
+
+        if interleave == "band":
+            pixel_space = dtype.itemsize
+            line_space = pixel_space * window.size_x
+            band_space = line_space * window.size_y
+            shape = (count, window.size_y, window.size_x)
+            strides = (band_space, line_space, pixel_space)
+        else:
+            band_space = dtype.itemsize
+            pixel_space = band_space * count
+            line_space = pixel_space * window.size_x
+            shape = (window.size_y, window.size_x, count)
+            strides = (line_space, pixel_space, band_space)
+
+        handle = GDALDatasetGetVirtualMem(
+            self, flag, window.offset_x, window.offset_y,
+            window.size_x, window.size_y, window.size_x, window.size_y,
+            _data_type(dtype), count, _band_map(bands),
+            pixel_space, line_space, band_space,
+            cache_size, page_size_hint, single_thread, None
+        )
+        return _virtual_mem_array(handle, self, shape, strides, dtype, write)
+
+    def read_async(self, *args, **kwargs):
+        """ Coroutine version of `read`, running in the default executor of
+            `pygdal.aio`.
+        """
+        from pygdal import aio
+        return aio.read(self, *args, **kwargs)
+
+    def iter_windows_async(self, windows, prefetch=2, **kwargs):
+        """ Asynchronous version of `iter_windows`, see `pygdal.aio`.
+        """
+        from pygdal import aio
+        return aio.iter_windows(self, windows, prefetch, **kwargs)
+
+    def async_reader(self, offset_x=0, offset_y=0, size_x=None, size_y=None,
+                     bands=None, array=None, interleave="band", out_shape=None,
+                     timeout=1.0, options=None):
+        """ Returns an `AsyncReader` progressively reading the window into an
+            array, see `read` for the arguments. Use it as a context manager
+            and iterate over it to get the regions of the array as they are
+            updated.
+        """
+        window = _resolve_window(self, offset_x, offset_y, size_x, size_y)
+        bands = self._band_list(bands)
+        if array is None:
+            array = self._get_numpy_array(
+                window, bands, interleave, out_shape=out_shape
+            )
+        return AsyncReader(
+            self, window, array, bands, interleave, timeout, options
+        )
+
+    def read_windows(self, windows, workers=4, bands=None, out=None, interleave="band"):
+        """ Reads the given windows concurrently in a pool of `workers`
+            threads and returns a list of arrays in the order of the windows.
+            Each thread opens its own non-shared handle of the dataset, as a
+            handle must never be used by several threads at once. A list of
+            preallocated arrays can be passed as `out`.
+        """
+        if not self._open_args:
+            raise ValueError("Only opened datasets can be read in parallel.")
+
+        windows = [_resolve_window(self, *window) for window in windows]
+        bands = self._band_list(bands)
+
+        if out is None:
+            out = [
+                self._get_numpy_array(window, bands, interleave)
+                for window in windows
+            ]
+        elif len(out) != len(windows):
+            raise ValueError("Expected one output array per window.")
+
+        datasets = _ThreadLocalDatasets(*self._open_args)
+
+        def read(args):
+            window, array = args
+            datasets.get().read(
+                *window, bands=bands, array=array, interleave=interleave
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(read, zip(windows, out)):
+                    pass
+        finally:
+            datasets.close()
+
+        return out
 
     def __getitem__(self, accessor):
         band_index = None
@@ -189,14 +636,37 @@ class Dataset(ManagedObject):
 
         raise ValueError
 
-    def copy_to(self, other):
-        pass
+    def copy_to(self, other, options=None, progress=None):
+        """ Copies the raster data of all bands to the `other` dataset of the
+            same size and band count. The `options` of GDAL's whole raster
+            copy, e.g. {"COMPRESSED": True} or {"INTERLEAVE": "PIXEL"}, are
+            passed as with `Driver.create`. A `progress(complete, message)`
+            callable is called during the copy, which is cancelled when it
+            returns False.
+        """
+        GDALDatasetCopyWholeRaster(
+            self, other, to_char_p_p(options), _progress_func(progress), None
+        )
+        other._invalidate()
+        _invalidate_tiles(other._handle)
 
     def _close(self):
         if self._handle:
-            GDALClose(self)
+            _invalidate_tiles(self._handle)
+            if self._mappings:
+                # memory maps still access the handle, so it is closed when
+                # the last of them is freed
+                self._deferred_handle = self._handle
+            else:
+                GDALClose(self)
             self._handle = None
 
+    def _release_mapping(self):
+        self._mappings -= 1
+        if not self._mappings and self._deferred_handle:
+            GDALClose(self._deferred_handle)
+            self._deferred_handle = None
+
     def __del__(self):
         self._close()
 
@@ -208,20 +678,161 @@ class Dataset(ManagedObject):
     def __exit__(self, exc_type, exc_value, exc_tb):
         self._close()
 
+    # pickling
+
+    def __reduce__(self):
+        """ Datasets are pickled as a descriptor of how they were opened and
+            reopened when unpickled, e.g. in another process.
+        """
+        if not self._open_args:
+            raise TypeError("Only opened datasets can be pickled.")
+        return (_reopen, self._open_args)
+
     # opening
 
     @classmethod
-    def open(cls, name, mode=GA_ReadOnly, shared=True):
-        if shared:
-            handle = GDALOpenShared(name, mode)
+    def open(cls, name, mode=GA_ReadOnly, shared=True, options=None):
+        _ensure_drivers()
+        encoded = _encode(name)
+        if options:
+            flags = GDAL_OF_RASTER
+            if mode == GA_Update:
+                flags |= GDAL_OF_UPDATE
+            if shared:
+                flags |= GDAL_OF_SHARED
+            handle = GDALOpenEx(encoded, flags, None, to_char_p_p(options), None)
+        elif shared:
+            handle = GDALOpenShared(encoded, mode)
         else:
-            handle = GDALOpen(name, mode)
-        return cls(handle)
+            handle = GDALOpen(encoded, mode)
+        dataset = cls(handle)
+        dataset._open_args = (name, mode, options)
+        return dataset
 
 
 open = Dataset.open
 
 
+def _reopen(name, mode, options):
+    # unpickled datasets get their own handle, see `parallel._worker_dataset`
+    return Dataset.open(name, mode, shared=False, options=options)
+
+
+class AsyncReader(ManagedObject):
+    """ Progressive reader of a dataset window using the asynchronous reader
+        of GDAL. Iterating over it yields (window, view) tuples of the regions
+        of `array` updated so far, in buffer coordinates. The buffer is
+        locked while a region is processed. For formats without progressive
+        decoding the whole window is returned as a single region.
+    """
+
+    def __init__(self, dataset, window, array, bands, interleave="band",
+                 timeout=1.0, options=None):
+        super(AsyncReader, self).__init__(None)
+        self.dataset = dataset
+        self.window = window
+        self.array = array
+        self.interleave = interleave
+        self.timeout = timeout
+        self._bands = bands
+        self._options = options
+
+    def __enter__(self):
+        count, buf_size_x, buf_size_y, pixel_space, line_space, band_space = \
+            _buffer_layout(self.array, self.interleave)
+        # the band map and options must outlive the reader
+        self._band_map = _band_map(self._bands)
+        self._options_p = to_char_p_p(self._options)
+        self._handle = GDALBeginAsyncReader(
+            self.dataset, self.window.offset_x, self.window.offset_y,
+            self.window.size_x, self.window.size_y,
+            self.array.ctypes.data_as(c_void_p), buf_size_x, buf_size_y,
+            _data_type(self.array.dtype), count, self._band_map,
+            pixel_space, line_space, band_space, self._options_p
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+    def __iter__(self):
+        if not self._handle:
+            raise ValueError(
+                "The reader is not started, use it as a context manager."
+            )
+        return self._regions()
+
+    def _regions(self):
+        offset_x, offset_y = c_int(), c_int()
+        size_x, size_y = c_int(), c_int()
+        while True:
+            status = GDALARGetNextUpdatedRegion(
+                self, self.timeout, byref(offset_x), byref(offset_y),
+                byref(size_x), byref(size_y)
+            )
+            if status == GARIO_ERROR:
+                raise IOError(last_error_message() or "Asynchronous read failed.")
+
+            if status in (GARIO_UPDATE, GARIO_COMPLETE) and size_x.value and size_y.value:
+                window = Window(
+                    offset_x.value, offset_y.value, size_x.value, size_y.value
+                )
+                GDALARLockBuffer(self, -1.0)
+                try:
+                    yield window, self._view(window)
+                finally:
+                    GDALARUnlockBuffer(self)
+
+            if status == GARIO_COMPLETE:
+                return
+
+    def _view(self, window):
+        rows = slice(window.offset_y, window.offset_y + window.size_y)
+        cols = slice(window.offset_x, window.offset_x + window.size_x)
+        if self.interleave == "band":
+            return self.array[:, rows, cols]
+        return self.array[rows, cols, :]
+
+    def close(self):
+        if self._handle:
+            GDALEndAsyncReader(self.dataset, self)
+            self._handle = None
+
+    def __del__(self):
+        self.close()
+
+
+class _ThreadLocalDatasets(object):
+    """ Hands out a separate, non-shared read-only handle of the same dataset
+        to each thread.
+    """
+
+    def __init__(self, name, mode=GA_ReadOnly, options=None):
+        self._name = name
+        self._options = options
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._datasets = []
+
+    def get(self):
+        try:
+            return self._local.dataset
+        except AttributeError:
+            dataset = Dataset.open(
+                self._name, GA_ReadOnly, shared=False, options=self._options
+            )
+            self._local.dataset = dataset
+            with self._lock:
+                self._datasets.append(dataset)
+            return dataset
+
+    def close(self):
+        with self._lock:
+            for dataset in self._datasets:
+                dataset._close()
+            self._datasets = []
+
+
 class Band(ManagedObject):
     """ Python wrapper for GDAl Raster Band related functions and data.
     """
@@ -239,9 +850,29 @@ class Band(ManagedObject):
             return Dataset(dataset_handle)
 
     @property
+    @cached
     def index(self):
         return GDALGetBandNumber(self)
 
+    @property
+    def _path(self):
+        dataset = self._dataset_ref and self._dataset_ref()
+        if dataset:
+            return dataset.path
+        return GDALGetDescription(GDALGetBandDataset(self))
+
+    def metadata_item(self, name, domain=None):
+        """ The value of the metadata item in the given domain, or None.
+        """
+        return _decode(
+            GDALGetMetadataItem(self, _encode(name), _encode(domain))
+        )
+
+    @property
+    def _cache_source(self):
+        # the handle of the dataset, or of the band itself for overviews
+        return GDALGetBandDataset(self) or self._handle
+
     @property
     def color_interpretation(self):
         return GDALGetRasterColorInterpretation(self)
@@ -251,6 +882,7 @@ class Band(ManagedObject):
         return GDALGetColorInterpretationName(self.color_interpretation)
 
     @property
+    @cached
     def data_type(self):
         return GDALGetRasterDataType(self)
 
@@ -259,6 +891,7 @@ class Band(ManagedObject):
         return GDALGetDataTypeName(self.data_type)
 
     @property
+    @cached
     def dtype(self):
         """ Numpy dtype.
         """
@@ -269,13 +902,57 @@ class Band(ManagedObject):
         return (self.size_x, self.size_y)
 
     @property
+    @cached
     def size_x(self):
         return GDALGetRasterBandXSize(self)
 
     @property
+    @cached
     def size_y(self):
         return GDALGetRasterBandYSize(self)
 
+    @property
+    def overviews(self):
+        """ The overview bands, ordered from the largest to the smallest.
+        """
+        return [
+            Band(GDALGetOverview(self, index), self._dataset_ref)
+            for index in range(GDALGetOverviewCount(self))
+        ]
+
+    @property
+    def has_arbitrary_overviews(self):
+        return bool(GDALHasArbitraryOverviews(self))
+
+    def regenerate_overviews(self, resampling="nearest", progress=None):
+        """ Recomputes the existing overviews of the band from its data. See
+            `Dataset.build_overviews` for the `progress` callback.
+        """
+        overviews = self.overviews
+        handles = (gdal_rasterband_h * len(overviews))(
+            *[overview._handle for overview in overviews]
+        )
+        GDALRegenerateOverviews(
+            self, len(overviews), handles, _encode(resampling.upper()),
+            _progress_func(progress), None
+        )
+
+    @property
+    @cached
+    def block_size(self):
+        """ The natural block size of the band as (block_size_x, block_size_y).
+        """
+        block_size_x = c_int()
+        block_size_y = c_int()
+        GDALGetBlockSize(self, byref(block_size_x), byref(block_size_y))
+        return block_size_x.value, block_size_y.value
+
+    def block_windows(self):
+        """ Yields the windows of the natural block layout in row major order.
+        """
+        block_size_x, block_size_y = self.block_size
+        return block_windows(self.size_x, self.size_y, block_size_x, block_size_y)
+
     
     @property
     def unit(self):
@@ -306,49 +983,401 @@ class Band(ManagedObject):
     def scale(self, value):
         GDALGetRasterScale(self, value)    
 
-    # Raster access
-
-    def _get_numpy_array(self, offset_x=0, offset_y=0, size_x=None, size_y=None):
-        if not size_x:
-            size_x = self.size_x - offset_x
+    @property
+    def nodata(self):
+        success = c_int()
+        value = GDALGetRasterNoDataValue(self, byref(success))
+        if not success:
+            return None
+        return value
+    @nodata.setter
+    def nodata(self, value):
+        GDALSetRasterNoDataValue(self, value)
 
-        if not size_y:
-            size_y = self.size_y - offset_y
+    @property
+    def mask_flags(self):
+        return GDALGetMaskFlags(self)
 
-        assert((size_x + offset_x) <= self.size_x)
-        assert((size_y + offset_y) <= self.size_y)
+    @property
+    def mask_band(self):
+        return Band(GDALGetMaskBand(self), self._dataset_ref)
+
+    def _valid(self, window, data, flags=None):
+        # returns a boolean array of the valid pixels of the data read from
+        # the window, or None if all pixels are valid
+        if flags is None:
+            flags = self.mask_flags
+        if flags & GMF_ALL_VALID:
+            return None
+        elif flags & GMF_NODATA and not flags & GMF_PER_DATASET:
+            # a per dataset nodata mask combines the values of all bands
+            nodata = self.nodata
+            if nodata is None:
+                return None
+            elif np.isnan(nodata):
+                return ~np.isnan(data)
+            return data != nodata
+        return self.mask_band.read(*window, out_shape=data.shape) != 0
+
+    def _masked(self, window, data):
+        # wraps the data read from the window as a masked array
+        valid = self._valid(window, data)
+        return np.ma.MaskedArray(
+            data, mask=np.ma.nomask if valid is None else ~valid
+        )
 
-        return np.empty((size_y, size_x), dtype=self.dtype)
+    # Statistics
 
-    def read(self, offset_x=0, offset_y=0, size_x=None, size_y=None, mask=False, array=None):
-        """ Read the data from the given window. The data is returned as a 
-            numpy array.
+    def minmax(self, approx=False, native=True, workers=None):
+        """ Computes the minimum and maximum value of the band. See
+            `statistics` for the arguments.
         """
-        array = array or self._get_numpy_array(offset_x, offset_y, size_x, size_y)
-
-        size_x = size_x or self.size_x
-        size_y = size_y or self.size_y
+        if native and not workers:
+            minmax = (c_double * 2)()
+            GDALComputeRasterMinMax(self, approx, minmax)
+            return minmax[0], minmax[1]
+
+        result = self.statistics(native=False, workers=workers)
+        return result.min, result.max
+
+    def statistics(self, approx=False, native=True, workers=None, progress=None):
+        """ Computes the minimum, maximum, mean and standard deviation of the
+            valid values of the band. By default the native GDAL routine is
+            used, which may use overviews or a subset of blocks if `approx`
+            is set, and reports no count. The metadata of the band is left
+            unchanged. Otherwise, or with `workers`, all
+            blocks are processed in a single streaming pass, see
+            `pygdal.stats`.
+        """
+        from pygdal import stats
+
+        if native and not workers:
+            minimum, maximum = c_double(), c_double()
+            mean, std = c_double(), c_double()
+            # GDAL stores the statistics as metadata, which would be written
+            # to the file or an .aux.xml file, so the items are restored
+            previous = [
+                (name, self.metadata_item(name)) for name in STATISTICS_ITEMS
+            ]
+            try:
+                GDALComputeRasterStatistics(
+                    self, approx, byref(minimum), byref(maximum), byref(mean),
+                    byref(std), _progress_func(progress), None
+                )
+            finally:
+                for name, value in previous:
+                    GDALSetMetadataItem(
+                        self, _encode(name), _encode(value), None
+                    )
+            return stats.Statistics(
+                minimum.value, maximum.value, mean.value, std.value, None
+            )
+
+        return stats.statistics(self, workers)
+
+    def histogram(self, bins=256, range=None, approx=False,
+                  include_out_of_range=False, native=True, workers=None,
+                  progress=None):
+        """ Computes the histogram of the band with `bins` equally sized bins
+            over the `range` (minimum, maximum), which defaults to the value
+            range of the band. Returns the counts and the bin edges like
+            `numpy.histogram`, i.e. the last bin includes the maximum. With
+            `include_out_of_range` values outside of the range are counted
+            in the first or last bin. See `statistics` for the other
+            arguments.
+        """
+        from pygdal import stats
+
+        if not native or workers:
+            return stats.histogram(self, bins, range, include_out_of_range, workers)
+
+        # the exact value range is covered by the histogram, so including out
+        # of range values only adds the maximum to the last bin
+        covered = range is None and not approx
+        if range is None:
+            range = self.minmax(approx)
+        minimum, maximum = range
+
+        counts = (c_ulonglong * bins)()
+        GDALGetRasterHistogramEx(
+            self, minimum, maximum, bins, counts,
+            include_out_of_range or covered, approx,
+            _progress_func(progress), None
+        )
+        counts = np.array(counts, dtype=np.int64)
+
+        if not include_out_of_range and not covered:
+            # GDAL excludes values equal to the maximum, which are counted in
+            # a single bin only holding the maximum itself
+            count = (c_ulonglong * 1)()
+            GDALGetRasterHistogramEx(
+                self, maximum, np.nextafter(maximum, np.inf), 1, count,
+                False, approx, _progress_func(None), None
+            )
+            counts[-1] += count[0]
+
+        return counts, np.linspace(minimum, maximum, bins + 1)
+
+    def random_sample(self, count=2500):
+        """ Returns up to `count` valid values sampled from across the band.
+        """
+        samples = np.empty(count, dtype=np.float32)
+        count = GDALGetRandomRasterSample(
+            self, count, samples.ctypes.data_as(POINTER(c_float))
+        )
+        return samples[:count]
 
-        assert(array.ndim == 2)
+    # Raster access
 
-        GDALRasterIO(
-            self, GF_Read, offset_x, offset_y, size_x, size_y,
-            array.ctypes.data_as(c_void_p), size_x, size_y, self.data_type, 
-            0, 0 # TODO: ??
+    def _get_numpy_array(self, offset_x=0, offset_y=0, size_x=None, size_y=None):
+        window = _resolve_window(self, offset_x, offset_y, size_x, size_y)
+        return np.empty((window.size_y, window.size_x), dtype=self.dtype)
+
+    def _raster_io(self, flag, window, array, resampling=None, float_window=None):
+        buf_size_x, buf_size_y, pixel_space, line_space = _band_layout(array)
+        if resampling is None and float_window is None:
+            GDALRasterIO(
+                self, flag, window.offset_x, window.offset_y,
+                window.size_x, window.size_y,
+                array.ctypes.data_as(c_void_p), buf_size_x, buf_size_y,
+                _data_type(array.dtype), pixel_space, line_space
+            )
+        else:
+            GDALRasterIOEx(
+                self, flag, window.offset_x, window.offset_y,
+                window.size_x, window.size_y,
+                array.ctypes.data_as(c_void_p), buf_size_x, buf_size_y,
+                _data_type(array.dtype), pixel_space, line_space,
+                byref(_extra_arg(resampling, float_window))
+            )
+
+    def _select_overview(self, window, buf_size_x, buf_size_y):
+        # selects the most reduced level (the band itself or one of its
+        # overviews) that still has at least the resolution of the buffer and
+        # returns it with the window translated to its pixel space
+        factor = min(
+            float(window.size_x) / buf_size_x, float(window.size_y) / buf_size_y
         )
-
+        best, best_factor = self, 1.0
+        for overview in self.overviews:
+            overview_factor = float(self.size_x) / overview.size_x
+            if best_factor < overview_factor <= factor:
+                best, best_factor = overview, overview_factor
+
+        if best is self:
+            return self, window, None
+
+        scale_x = float(best.size_x) / self.size_x
+        scale_y = float(best.size_y) / self.size_y
+        float_window = (
+            window.offset_x * scale_x, window.offset_y * scale_y,
+            window.size_x * scale_x, window.size_y * scale_y
+        )
+        offset_x = int(float_window[0])
+        offset_y = int(float_window[1])
+        end_x = int(round(float_window[0] + float_window[2]))
+        end_y = int(round(float_window[1] + float_window[3]))
+        end_x = min(best.size_x, max(offset_x + 1, end_x))
+        end_y = min(best.size_y, max(offset_y + 1, end_y))
+
+        window = Window(offset_x, offset_y, end_x - offset_x, end_y - offset_y)
+        return best, window, float_window
+
+    def read(self, offset_x=0, offset_y=0, size_x=None, size_y=None, mask=False,
+             array=None, out_shape=None, resampling=None, dtype=None, cache=None):
+        """ Read the data from the given window. The data is returned as a 
+            numpy array. When an `array` is passed, the data is read directly
+            into it. Any writable view is accepted, e.g. a slice of a larger
+            mosaic or a single channel of a pixel interleaved image.
+
+            With an `out_shape` of (rows, cols) smaller than the window, the
+            data is read from the best fitting overview level and resampled
+            with the given `resampling` method.
+
+            If a `TileCache` is passed as `cache`, the decoded array is looked
+            up in and stored to it. Cached arrays are read-only. Entries are
+            keyed by the dataset handle and dropped when the band or its
+            dataset is written to or closed through pygdal.
+
+            With `mask` a `numpy.ma.MaskedArray` is returned, masking the
+            pixels that are invalid according to the mask flags of the band:
+            nodata values are compared directly, bands flagged as all valid
+            are not masked at all and only otherwise the mask band is read.
+        """
+        window = _resolve_window(self, offset_x, offset_y, size_x, size_y)
+
+        if mask:
+            data = self.read(
+                *window, array=array, out_shape=out_shape,
+                resampling=resampling, dtype=dtype, cache=cache
+            )
+            return self._masked(window, data)
+
+        if cache is not None and array is None:
+            source = self._cache_source
+            key = (
+                source, self._path, self.index, window,
+                np.dtype(dtype or self.dtype).str,
+                out_shape and tuple(out_shape), resampling
+            )
+            array = cache.get(key)
+            if array is None:
+                array = self.read(
+                    *window, out_shape=out_shape, resampling=resampling,
+                    dtype=dtype
+                )
+                cache.put(key, array, source)
+            return array
+
+        if array is None:
+            array = np.empty(
+                out_shape or (window.size_y, window.size_x),
+                dtype=dtype or self.dtype
+            )
+        elif not array.flags.writeable:
+            raise ValueError("Cannot read into a read-only array.")
+
+        buf_size_y, buf_size_x = array.shape
+        band, float_window = self, None
+        if (buf_size_x, buf_size_y) != (window.size_x, window.size_y):
+            band, window, float_window = self._select_overview(
+                window, buf_size_x, buf_size_y
+            )
+
+        band._raster_io(GF_Read, window, array, resampling, float_window)
         return array
 
     def write(self, data, offset_x=0, offset_y=0, size_x=None, size_y=None):
         """ Write the data from the given array into the dataset. Expected is
-            a numpy array.
+            a numpy array, which may be an arbitrarily strided view. Other
+            sequences, or arrays of types GDAL doesn't support, are converted
+            to the data type of the band.
         """
-        buf_size_x, buf_size_y = data.shape
-        GDALRasterIO(
-            self, GF_Write, offset_x, offset_y, size_x, size_y,
-            data.ctypes.data_as(c_void_p), buf_size_x, buf_size_y, self.data_type, 
-            0, 0 # TODO: ??
+        data = _as_array(data, self.dtype)
+        buf_size_x, buf_size_y, _, _ = _band_layout(data)
+        window = _resolve_window(
+            self, offset_x, offset_y,
+            buf_size_x if size_x is None else size_x,
+            buf_size_y if size_y is None else size_y
         )
+        self._raster_io(GF_Write, window, data)
+        _invalidate_tiles(self._cache_source)
+
+    def advise_read(self, offset_x=0, offset_y=0, size_x=None, size_y=None):
+        """ Advises the driver that the given window will be read soon, so
+            that it can start fetching the data asynchronously.
+        """
+        window = _resolve_window(self, offset_x, offset_y, size_x, size_y)
+        GDALRasterAdviseRead(
+            self, window.offset_x, window.offset_y, window.size_x, window.size_y,
+            window.size_x, window.size_y, self.data_type, None
+        )
+
+    def iter_windows(self, windows, prefetch=2):
+        """ Reads the given windows one after another and yields
+            (window, array) tuples. While a window is being processed, the
+            next `prefetch` windows are already advised to the driver.
+        """
+        windows = [_resolve_window(self, *window) for window in windows]
+
+        advised = 0
+        for index, window in enumerate(windows):
+            while advised < min(index + prefetch + 1, len(windows)):
+                self.advise_read(*windows[advised])
+                advised += 1
+            yield window, self.read(*window)
+
+    def as_memmap(self, offset_x=0, offset_y=0, size_x=None, size_y=None,
+                  write=False, dtype=None, tile_size=None,
+                  cache_size=64 * 1024 * 1024, page_size_hint=0,
+                  single_thread=False):
+        """ Returns a numpy array mapping the given window into virtual
+            memory. The data is only read when pages of the array are
+            accessed. For raw formats the file is mapped directly when the
+            whole band is requested. With a `tile_size` of
+            (tile_size_x, tile_size_y) the array is shaped
+            (tiles_y, tiles_x, tile_size_y, tile_size_x). The array keeps the
+            band and its dataset open, even past `close`, until it is freed.
+        """
+        window = _resolve_window(self, offset_x, offset_y, size_x, size_y)
+        flag = GF_Write if write else GF_Read
+        owner = (self, self._dataset_ref and self._dataset_ref())
+
+        if tile_size is None and dtype is None and \
+                window == (0, 0, self.size_x, self.size_y):
+            pixel_space = c_int()
+            line_space = c_gintbig()
+            handle = GDALGetVirtualMemAuto(
+                self, flag, byref(pixel_space), byref(line_space), None
+            )
+            if handle:
+                return _virtual_mem_array(
+                    handle, owner, (window.size_y, window.size_x),
+                    (line_space.value, pixel_space.value), self.dtype, write
+                )
+
+        dtype = np.dtype(dtype or self.dtype)
+
+        if tile_size is not None:
+            tile_size_x, tile_size_y = tile_size
+            handle = GDALRasterBandGetTiledVirtualMem(
+                self, flag, window.offset_x, window.offset_y,
+                window.size_x, window.size_y, tile_size_x, tile_size_y,
+                _data_type(dtype), cache_size, single_thread, None
+            )
+            shape = (
+                -(-window.size_y // tile_size_y), -(-window.size_x // tile_size_x),
+                tile_size_y, tile_size_x
+            )
+            return _virtual_mem_array(handle, owner, shape, None, dtype, write)
+
+        handle = GDALRasterBandGetVirtualMem(
+            self, flag, window.offset_x, window.offset_y,
+            window.size_x, window.size_y, window.size_x, window.size_y,
+            _data_type(dtype), dtype.itemsize, dtype.itemsize * window.size_x,
+            cache_size, page_size_hint, single_thread, None
+        )
+        return _virtual_mem_array(
+            handle, owner, (window.size_y, window.size_x), None, dtype, write
+        )
+
+    def read_async(self, *args, **kwargs):
+        """ Coroutine version of `read`, running in the default executor of
+            `pygdal.aio`.
+        """
+        from pygdal import aio
+        return aio.read(self, *args, **kwargs)
+
+    def iter_windows_async(self, windows, prefetch=2, **kwargs):
+        """ Asynchronous version of `iter_windows`, see `pygdal.aio`.
+        """
+        from pygdal import aio
+        return aio.iter_windows(self, windows, prefetch, **kwargs)
+
+    def iter_blocks(self, reuse=False):
+        """ Iterates over the natural blocks of the band and yields
+            (window, array) tuples. The arrays of the edge blocks are clipped
+            to the raster size. If `reuse` is set, a single scratch buffer is
+            used for all blocks, so each array is only valid until the next
+            iteration.
+        """
+        if self.data_type not in GDT_TO_DTYPE:
+            raise ValueError(
+                "Unsupported data type '%s'." % self.data_type_name
+            )
+
+        block_size_x, block_size_y = self.block_size
+        buffer = None
+        for window in self.block_windows():
+            if buffer is None or not reuse:
+                buffer = np.empty((block_size_y, block_size_x), dtype=self.dtype)
+
+            GDALReadBlock(
+                self, window.offset_x // block_size_x,
+                window.offset_y // block_size_y,
+                buffer.ctypes.data_as(c_void_p)
+            )
+            yield window, buffer[:window.size_y, :window.size_x]
 
     def __getitem__(self, accessor):
         try:
@@ -370,12 +1399,55 @@ class Band(ManagedObject):
 
     def fill(self, value, ivalue=0.0):
         GDALFillRaster(self, value, ivalue)
+        _invalidate_tiles(self._cache_source)
 
-    def copy_to(self, other):
-        pass
+    def copy_to(self, other, options=None, progress=None):
+        """ Copies the raster data to the `other` band of the same size. See
+            `Dataset.copy_to` for the arguments.
+        """
+        GDALRasterBandCopyWholeRaster(
+            self, other, to_char_p_p(options), _progress_func(progress), None
+        )
+        other._invalidate()
+        _invalidate_tiles(other._cache_source)
+
+
+
+
+
+class _VirtualMem(ManagedObject):
+    """ Owns a CPLVirtualMem mapping and exposes it via the numpy array
+        interface. It is referenced by all arrays created from it and keeps
+        the raster it was created from alive. Closing the dataset is
+        deferred until the mapping is freed.
+    """
+
+    def __init__(self, handle, owner, shape, strides, dtype, writable):
+        super(_VirtualMem, self).__init__(handle)
+        self._owner = owner
+        self._dataset = owner if isinstance(owner, Dataset) else owner[1]
+        if self._dataset is not None:
+            self._dataset._mappings += 1
+        self.__array_interface__ = {
+            "version": 3,
+            "shape": shape,
+            "strides": strides,
+            "typestr": np.dtype(dtype).str,
+            "data": (CPLVirtualMemGetAddr(self), not writable),
+        }
 
+    def __del__(self):
+        if self._handle:
+            CPLVirtualMemFree(self)
+            self._handle = None
+            if self._dataset is not None:
+                self._dataset._release_mapping()
 
 
+def _virtual_mem_array(handle, owner, shape, strides, dtype, writable):
+    return np.asarray(
+        _VirtualMem(handle, owner, shape, strides, dtype, writable)
+    )
 
 
 GDT_TO_DTYPE = {
@@ -398,23 +1470,226 @@ DTYPE_TO_GDT = dict(
 )
 
 
+def _resolve_window(raster, offset_x=0, offset_y=0, size_x=None, size_y=None):
+    # fills in the defaults of a window and checks it against the raster size
+    offset_x = offset_x or 0
+    offset_y = offset_y or 0
+
+    if size_x is None:
+        size_x = raster.size_x - offset_x
+    if size_y is None:
+        size_y = raster.size_y - offset_y
+
+    if (offset_x + size_x) > raster.size_x or (offset_y + size_y) > raster.size_y:
+        raise ValueError("Window exceeds the raster size.")
+
+    return Window(offset_x, offset_y, size_x, size_y)
+
+
+def _as_array(data, dtype):
+    # arrays of supported types are used as they are, e.g. strided views,
+    # only swapped to the native byte order GDAL expects
+    if isinstance(data, np.ndarray) and data.dtype.type in DTYPE_TO_GDT:
+        if not data.dtype.isnative:
+            return data.astype(data.dtype.newbyteorder("="))
+        return data
+    return np.asarray(data, dtype=dtype)
+
+
+def _data_type(dtype):
+    dtype = np.dtype(dtype)
+    if not dtype.isnative:
+        raise ValueError("Non-native byte order of data type '%s'." % dtype)
+    try:
+        return DTYPE_TO_GDT[dtype.type]
+    except KeyError:
+        raise ValueError("Unsupported data type '%s'." % dtype)
+
+
+def _value_dtype(value):
+    # the smallest data type holding a nodata value exactly
+    if float(value).is_integer():
+        return np.min_scalar_type(int(value))
+    elif np.isnan(value) or np.float32(value) == value:
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
+
+
+RESAMPLING = {
+    "nearest": GRIORA_NearestNeighbour,
+    "bilinear": GRIORA_Bilinear,
+    "cubic": GRIORA_Cubic,
+    "cubicspline": GRIORA_CubicSpline,
+    "lanczos": GRIORA_Lanczos,
+    "average": GRIORA_Average,
+    "mode": GRIORA_Mode,
+    "gauss": GRIORA_Gauss,
+}
+
+STATISTICS_ITEMS = (
+    "STATISTICS_MINIMUM", "STATISTICS_MAXIMUM", "STATISTICS_MEAN",
+    "STATISTICS_STDDEV", "STATISTICS_VALID_PERCENT",
+)
+
+
+def _extra_arg(resampling=None, float_window=None):
+    extra_arg = GDALRasterIOExtraArg()
+    extra_arg.nVersion = RASTERIO_EXTRA_ARG_CURRENT_VERSION
+    try:
+        extra_arg.eResampleAlg = RESAMPLING[(resampling or "nearest").lower()]
+    except KeyError:
+        raise ValueError("Invalid resampling method '%s'." % resampling)
+
+    if float_window is not None:
+        extra_arg.bFloatingPointWindowValidity = 1
+        (extra_arg.dfXOff, extra_arg.dfYOff,
+         extra_arg.dfXSize, extra_arg.dfYSize) = float_window
+    return extra_arg
+
+
+def _encode(value):
+    # encodes strings for char* arguments
+    if value is None or isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8")
+
+
+def _invalidate_tiles(source):
+    # drops the entries read from the source from all tile caches, which
+    # only exist once the module is imported
+    tilecache = sys.modules.get("pygdal.tilecache")
+    if tilecache is not None:
+        tilecache.invalidate(source)
+
+
+def _decode(value):
+    # decodes strings returned as char*
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return value
+
+
+def _progress_func(progress):
+    # wraps a `progress(complete, message)` callable as GDALProgressFunc,
+    # the operation is cancelled when it returns False
+    if progress is None:
+        return GDAL_PROGRESS_FUNC()
+
+    def callback(complete, message, data):
+        if message is not None:
+            message = message.decode("utf-8", "replace")
+        return 0 if progress(complete, message) is False else 1
+
+    return GDAL_PROGRESS_FUNC(callback)
+
+
+@contextmanager
+def config_options(**options):
+    """ Context manager to temporarily set GDAL configuration options for
+        the calling thread, taking precedence over the global ones. Other
+        threads are not affected. The previous values are restored on exit.
+    """
+    previous = {}
+    for key, value in options.items():
+        previous[key] = CPLGetThreadLocalConfigOption(_encode(key), None)
+        CPLSetThreadLocalConfigOption(_encode(key), _encode(value))
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            CPLSetThreadLocalConfigOption(_encode(key), value)
+
+
+def _band_map(bands):
+    return (c_int * len(bands))(*bands)
+
+
+def _check_strides(array):
+    # the spacing of dimensions of length one is never used
+    if any(stride <= 0 for stride, length in zip(array.strides, array.shape) if length > 1):
+        raise ValueError("Arrays with negative or zero strides are not supported.")
+
+
+def _band_layout(array):
+    # returns the buffer size and GDAL pixel/line spacing of a two
+    # dimensional array, as derived from its strides
+    if array.ndim != 2:
+        raise ValueError("Expected a two dimensional array.")
+    _check_strides(array)
+
+    size_y, size_x = array.shape
+    line_space, pixel_space = array.strides
+    return size_x, size_y, pixel_space, line_space
+
+
+def _buffer_layout(array, interleave):
+    # returns the band count, buffer size and GDAL pixel/line/band spacing
+    # of a three dimensional array, as derived from its strides
+    if array.ndim != 3:
+        raise ValueError("Expected a three dimensional array.")
+
+    if interleave == "band":
+        count, size_y, size_x = array.shape
+        band_space, line_space, pixel_space = array.strides
+    elif interleave == "pixel":
+        size_y, size_x, count = array.shape
+        line_space, pixel_space, band_space = array.strides
+    else:
+        raise ValueError("Invalid interleave '%s'." % interleave)
+    _check_strides(array)
+
+    return count, size_x, size_y, pixel_space, line_space, band_space
+
+
 # setup stuff
 
 use_exceptions()
-GDALAllRegister()
+
+
+_drivers_registered = False
+_drivers_lock = threading.Lock()
+
+
+def register_drivers(names=None):
+    """ Registers the drivers with the given short names, e.g.
+        ["GTiff", "MEM", "VRT"], using their GDALRegister_<name> functions, or
+        all drivers if no names are given. Unless this is called explicitly,
+        all drivers are registered before the first dataset is opened or
+        driver is looked up.
+    """
+    global _drivers_registered
+    with _drivers_lock:
+        if names is None:
+            GDALAllRegister()
+        else:
+            for name in names:
+                getattr(_libgdal, "GDALRegister_%s" % name)()
+        _drivers_registered = True
+
+
+def _ensure_drivers():
+    if not _drivers_registered:
+        register_drivers()
 
 
 def to_char_p_p(values):
-    # converts a dict or a list of arguments to a ctypes compliant char** array
+    # converts a dict or a list of arguments to a ctypes compliant, NULL
+    # terminated char** array, which references the encoded strings
     if values is None:
         return None
     try:
-        items = values.items()
+        items = list(values.items())
     except AttributeError:
-        items = values
-
-    array = (c_char_p * len(items))()
-    for i, (key, value) in enumerate(items):
-        array[i] = "%s=%s" % (key, value)
+        items = list(values)
+
+    array = (c_char_p * (len(items) + 1))()
+    for i, item in enumerate(items):
+        if isinstance(item, (str, bytes)):
+            array[i] = _encode(item)
+            continue
+        key, value = item
+        if isinstance(value, bool):
+            value = "YES" if value else "NO"
+        array[i] = _encode("%s=%s" % (key, value))
 
     return array
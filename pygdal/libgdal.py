@@ -1,18 +1,130 @@
 from ctypes import *
 from functools import wraps
-
-_libgdal = CDLL("libgdal.so")
+import sys
+import threading
+
+
+class _LazyFunction(object):
+    """ Stands in for a function of the library. The restype, argtypes and
+        errcheck set on it are applied when the symbol is resolved on the
+        first call.
+    """
+
+    __slots__ = ("_library", "_name", "_attributes", "_function")
+
+    def __init__(self, library, name):
+        object.__setattr__(self, "_library", library)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_attributes", {})
+        object.__setattr__(self, "_function", None)
+
+    def __setattr__(self, key, value):
+        self._attributes[key] = value
+        if self._function is not None:
+            setattr(self._function, key, value)
+
+    def __getattr__(self, key):
+        try:
+            return self._attributes[key]
+        except KeyError:
+            return getattr(self._resolve(), key)
+
+    def _resolve(self):
+        function = self._function
+        if function is None:
+            function = getattr(self._library._load(), self._name)
+            for key, value in self._attributes.items():
+                setattr(function, key, value)
+            object.__setattr__(self, "_function", function)
+        return function
+
+    def __call__(self, *args):
+        function = self._function
+        if function is None:
+            function = self._resolve()
+        return function(*args)
+
+    @property
+    def _as_parameter_(self):
+        # allows passing the function itself as a function pointer
+        return self._resolve()
+
+
+class _LazyLibrary(object):
+    """ Loads the shared library on first use and hands out lazily resolved
+        functions, so that importing the bindings is cheap. Once loaded, the
+        functions are resolved and bound in place of their stand-ins, so
+        calls do not go through them.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._library = None
+        self._lock = threading.Lock()
+        self._functions = []
+
+    @property
+    def loaded(self):
+        return self._library is not None
+
+    def _load(self):
+        if self._library is None:
+            with self._lock:
+                if self._library is None:
+                    library = CDLL(self._name)
+                    self._library = library
+                    self._bind()
+                    _on_load()
+        return self._library
+
+    def _bind(self):
+        # replaces the stand-ins in the modules of the package by the
+        # functions, skipping those missing in this version of the library
+        for function in self._functions:
+            try:
+                function._resolve()
+            except AttributeError:
+                pass
+        del self._functions[:]
+
+        for name, module in list(sys.modules.items()):
+            if module is None or name.split(".")[0] != "pygdal":
+                continue
+            for key, value in list(vars(module).items()):
+                if isinstance(value, _LazyFunction) and \
+                        value._library is self and value._function is not None:
+                    setattr(module, key, value._function)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        function = _LazyFunction(self, name)
+        if self._library is None:
+            self._functions.append(function)
+        return function
+
+
+_libgdal = _LazyLibrary("libgdal.so")
 
 _USE_EXCEPTIONS = False
 
 def use_exceptions(value=True):
     global _USE_EXCEPTIONS
     _USE_EXCEPTIONS = value
+    # the error handler is installed once the library is loaded
+    if _libgdal.loaded:
+        _set_error_handler()
+
+def _set_error_handler():
     if _USE_EXCEPTIONS:
         CPLSetErrorHandler(CPLQuietErrorHandler)
     else:
         CPLSetErrorHandler(CPLDefaultErrorHandler)
 
+def _on_load():
+    if _USE_EXCEPTIONS:
+        _set_error_handler()
+
 
 CPLE_None = 0
 CPLE_AppDefined = 1
@@ -42,27 +154,34 @@ CPLE_TO_EXCEPTION = {
 
 # utility funcs
 
+def last_error_message():
+    message = CPLGetLastErrorMsg()
+    return message.decode("utf-8", "replace") if message else ""
+
 def cplerr_errcheck(result, func, arguments):
     if _USE_EXCEPTIONS and result != CPLE_None:
         e_type = CPLE_TO_EXCEPTION.get(result, Exception)
-        raise e_type(CPLGetLastErrorMsg())
+        raise e_type(last_error_message())
     return result
 
 def null_errcheck(result, func, arguments):
     if _USE_EXCEPTIONS and result == None:
         e_type = CPLE_TO_EXCEPTION.get(CPLGetLastErrorType(), Exception)
-        raise e_type(CPLGetLastErrorMsg())
+        raise e_type(last_error_message())
     return result
 
 # type declarations
 
 c_char_p_p = POINTER(c_char_p)
+c_gintbig = c_longlong
 
 gdal_major_object_h = c_void_p
 gdal_driver_h = c_void_p
 gdal_dataset_h = c_void_p
 gdal_rasterband_h = c_void_p
 gdal_color_table_h = c_void_p
+cpl_virtual_mem_h = c_void_p
+gdal_async_reader_h = c_void_p
 
 gdal_geotransform_type = c_double * 6
 
@@ -79,6 +198,21 @@ class GDAL_GCP(Structure):
         ("z", c_double)
     ]
 
+class GDALRasterIOExtraArg(Structure):
+    _fields_ = [
+        ("nVersion", c_int),
+        ("eResampleAlg", c_int),
+        ("pfnProgress", GDAL_PROGRESS_FUNC),
+        ("pProgressData", c_void_p),
+        ("bFloatingPointWindowValidity", c_int),
+        ("dfXOff", c_double),
+        ("dfYOff", c_double),
+        ("dfXSize", c_double),
+        ("dfYSize", c_double)
+    ]
+
+RASTERIO_EXTRA_ARG_CURRENT_VERSION = 1
+
 # CPL function wrappers
 
 CPLGetLastErrorType = _libgdal.CPLGetLastErrorType
@@ -95,6 +229,31 @@ CPL_ERROR_HANDLER_TYPE = CFUNCTYPE(None, c_int, c_int, c_char_p)
 CPLSetErrorHandler = _libgdal.CPLSetErrorHandler
 #CPLSetErrorHandler.argtypes = [CPL_ERROR_HANDLER_TYPE]
 
+CPLGetConfigOption = _libgdal.CPLGetConfigOption
+CPLGetConfigOption.restype = c_char_p
+CPLGetConfigOption.argtypes = [c_char_p, c_char_p]
+
+CPLSetConfigOption = _libgdal.CPLSetConfigOption
+CPLSetConfigOption.argtypes = [c_char_p, c_char_p]
+
+CPLGetThreadLocalConfigOption = _libgdal.CPLGetThreadLocalConfigOption
+CPLGetThreadLocalConfigOption.restype = c_char_p
+CPLGetThreadLocalConfigOption.argtypes = [c_char_p, c_char_p]
+
+CPLSetThreadLocalConfigOption = _libgdal.CPLSetThreadLocalConfigOption
+CPLSetThreadLocalConfigOption.argtypes = [c_char_p, c_char_p]
+
+CPLVirtualMemGetAddr = _libgdal.CPLVirtualMemGetAddr
+CPLVirtualMemGetAddr.restype = c_void_p
+CPLVirtualMemGetAddr.argtypes = [cpl_virtual_mem_h]
+
+CPLVirtualMemGetSize = _libgdal.CPLVirtualMemGetSize
+CPLVirtualMemGetSize.restype = c_size_t
+CPLVirtualMemGetSize.argtypes = [cpl_virtual_mem_h]
+
+CPLVirtualMemFree = _libgdal.CPLVirtualMemFree
+CPLVirtualMemFree.argtypes = [cpl_virtual_mem_h]
+
 
 
 # GDAL defines
@@ -115,9 +274,26 @@ GDT_CFloat64 = 11
 GA_ReadOnly = 0
 GA_Update = 1
 
+GDAL_OF_ALL = 0x00
+GDAL_OF_READONLY = 0x00
+GDAL_OF_UPDATE = 0x01
+GDAL_OF_RASTER = 0x02
+GDAL_OF_VECTOR = 0x04
+GDAL_OF_SHARED = 0x20
+GDAL_OF_VERBOSE_ERROR = 0x40
+
 GF_Read = 0
 GF_Write = 1
 
+GRIORA_NearestNeighbour = 0
+GRIORA_Bilinear = 1
+GRIORA_Cubic = 2
+GRIORA_CubicSpline = 3
+GRIORA_Lanczos = 4
+GRIORA_Average = 5
+GRIORA_Mode = 6
+GRIORA_Gauss = 7
+
 GCI_Undefined = 0
 GCI_GrayIndex = 1
 GCI_PaletteIndex = 2
@@ -136,6 +312,20 @@ GCI_YCbCr_YBand = 14
 GCI_YCbCr_CbBand = 15
 GCI_YCbCr_CrBand = 16
 
+GARIO_PENDING = 0
+GARIO_UPDATE = 1
+GARIO_ERROR = 2
+GARIO_COMPLETE = 3
+
+GMF_ALL_VALID = 0x01
+GMF_PER_DATASET = 0x02
+GMF_ALPHA = 0x04
+GMF_NODATA = 0x08
+
+GTO_TIP = 0
+GTO_BIT = 1
+GTO_BSQ = 2
+
 # function wrappers
 
 GDALGetDataTypeSize = _libgdal.GDALGetDataTypeSize
@@ -205,6 +395,11 @@ GDALOpenShared.restype = gdal_dataset_h
 GDALOpenShared.argtypes = [c_char_p, c_int]
 GDALOpenShared.errcheck = null_errcheck
 
+GDALOpenEx = _libgdal.GDALOpenEx
+GDALOpenEx.restype = gdal_dataset_h
+GDALOpenEx.argtypes = [c_char_p, c_uint, c_char_p_p, c_char_p_p, c_char_p_p]
+GDALOpenEx.errcheck = null_errcheck
+
 #int     GDALDumpOpenDatasets (FILE *)
 #    List open datasets.
 
@@ -227,7 +422,6 @@ GDALDestroyDriver.argtypes = [gdal_driver_h]
 GDALRegisterDriver = _libgdal.GDALRegisterDriver
 GDALRegisterDriver.restype = c_int
 GDALRegisterDriver.argtypes = [gdal_driver_h]
-GDALRegisterDriver.errcheck = cplerr_errcheck
 
 GDALDeregisterDriver = _libgdal.GDALDeregisterDriver
 GDALDeregisterDriver.argtypes = [gdal_driver_h]
@@ -274,18 +468,17 @@ GDALGetDriverCreationOptionList.argtypes = [gdal_driver_h]
 #GDAL_GCP *  GDALDuplicateGCPs (int, const GDAL_GCP *)
 #int     GDALGCPsToGeoTransform (int nGCPCount, const GDAL_GCP *pasGCPs, double *padfGeoTransform, int bApproxOK) CPL_WARN_UNUSED_RESULT
 #    Generate Geotransform from GCPs. 
-#int     GDALInvGeoTransform (double *padfGeoTransformIn, double *padfInvGeoTransformOut) CPL_WARN_UNUSED_RESULT
-#    Invert Geotransform. 
 
 
 GDALApplyGeoTransform = _libgdal.GDALApplyGeoTransform
 GDALApplyGeoTransform.argtypes = [gdal_geotransform_type, c_double, c_double, POINTER(c_double), POINTER(c_double)]
 
+GDALInvGeoTransform = _libgdal.GDALInvGeoTransform
+GDALInvGeoTransform.restype = c_int
+GDALInvGeoTransform.argtypes = [gdal_geotransform_type, gdal_geotransform_type]
 
-"""
-void    GDALComposeGeoTransforms (const double *padfGeoTransform1, const double *padfGeoTransform2, double *padfGeoTransformOut)
-    Compose two geotransforms. 
-"""
+GDALComposeGeoTransforms = _libgdal.GDALComposeGeoTransforms
+GDALComposeGeoTransforms.argtypes = [gdal_geotransform_type, gdal_geotransform_type, gdal_geotransform_type]
 
 
 """
@@ -301,6 +494,15 @@ CPLErr  GDALSetMetadataItem (GDALMajorObjectH, const char *, const char *, const
     Set single metadata item. 
 """
 
+GDALGetMetadataItem = _libgdal.GDALGetMetadataItem
+GDALGetMetadataItem.restype = c_char_p
+GDALGetMetadataItem.argtypes = [gdal_major_object_h, c_char_p, c_char_p]
+
+GDALSetMetadataItem = _libgdal.GDALSetMetadataItem
+GDALSetMetadataItem.restype = c_int
+GDALSetMetadataItem.argtypes = [gdal_major_object_h, c_char_p, c_char_p, c_char_p]
+GDALSetMetadataItem.errcheck = cplerr_errcheck
+
 GDALGetDescription = _libgdal.GDALGetDescription
 GDALGetDescription.restype = c_char_p
 GDALGetDescription.argtypes = [gdal_major_object_h]
@@ -342,16 +544,27 @@ GDALAddBand.restype = c_int
 GDALAddBand.argtypes = [gdal_dataset_h, c_int, c_char_p_p]
 GDALAddBand.errcheck = cplerr_errcheck
 
-"""
-GDALAsyncReaderH    GDALBeginAsyncReader (GDALDatasetH hDS, int nXOff, int nYOff, int nXSize, int nYSize, void *pBuf, int nBufXSize, int nBufYSize, GDALDataType eBufType, int nBandCount, int *panBandMap, int nPixelSpace, int nLineSpace, int nBandSpace, char **papszOptions)
-void    GDALEndAsyncReader (GDALDatasetH hDS, GDALAsyncReaderH hAsynchReaderH)
-CPLErr  GDALDatasetRasterIO (GDALDatasetH hDS, GDALRWFlag eRWFlag, int nDSXOff, int nDSYOff, int nDSXSize, int nDSYSize, void *pBuffer, int nBXSize, int nBYSize, GDALDataType eBDataType, int nBandCount, int *panBandCount, int nPixelSpace, int nLineSpace, int nBandSpace)
-    Read/write a region of image data from multiple bands. 
-"""
+GDALBeginAsyncReader = _libgdal.GDALBeginAsyncReader
+GDALBeginAsyncReader.restype = gdal_async_reader_h
+GDALBeginAsyncReader.argtypes = [gdal_dataset_h, c_int, c_int, c_int, c_int, c_void_p, c_int, c_int, c_int, c_int, POINTER(c_int), c_int, c_int, c_int, c_char_p_p]
+GDALBeginAsyncReader.errcheck = null_errcheck
+
+GDALEndAsyncReader = _libgdal.GDALEndAsyncReader
+GDALEndAsyncReader.argtypes = [gdal_dataset_h, gdal_async_reader_h]
+
+GDALDatasetRasterIO = _libgdal.GDALDatasetRasterIO
+GDALDatasetRasterIO.restype = c_int
+GDALDatasetRasterIO.argtypes = [gdal_dataset_h, c_int, c_int, c_int, c_int, c_int, c_void_p, c_int, c_int, c_int, c_int, POINTER(c_int), c_int, c_int, c_int]
+GDALDatasetRasterIO.errcheck = cplerr_errcheck
+
+GDALDatasetRasterIOEx = _libgdal.GDALDatasetRasterIOEx
+GDALDatasetRasterIOEx.restype = c_int
+GDALDatasetRasterIOEx.argtypes = [gdal_dataset_h, c_int, c_int, c_int, c_int, c_int, c_void_p, c_int, c_int, c_int, c_int, POINTER(c_int), c_gintbig, c_gintbig, c_gintbig, POINTER(GDALRasterIOExtraArg)]
+GDALDatasetRasterIOEx.errcheck = cplerr_errcheck
 
 GDALDatasetAdviseRead = _libgdal.GDALDatasetAdviseRead
 GDALDatasetAdviseRead.restype = c_int
-GDALDatasetAdviseRead.argtypes = [gdal_dataset_h, c_int, c_int, c_int, c_int, c_int, c_int, POINTER(c_int), c_char_p_p]
+GDALDatasetAdviseRead.argtypes = [gdal_dataset_h, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_int, POINTER(c_int), c_char_p_p]
 GDALDatasetAdviseRead.errcheck = cplerr_errcheck
 
 GDALGetProjectionRef = _libgdal.GDALGetProjectionRef
@@ -405,9 +618,12 @@ int     GDALDereferenceDataset (GDALDatasetH)
 
 
 
+GDALBuildOverviews = _libgdal.GDALBuildOverviews
+GDALBuildOverviews.restype = c_int
+GDALBuildOverviews.argtypes = [gdal_dataset_h, c_char_p, c_int, POINTER(c_int), c_int, POINTER(c_int), GDAL_PROGRESS_FUNC, c_void_p]
+GDALBuildOverviews.errcheck = cplerr_errcheck
+
 """ 
-CPLErr  GDALBuildOverviews (GDALDatasetH, const char *, int, int *, int, int *, GDALProgressFunc, void *)
-    Build raster overview(s). 
 void    GDALGetOpenDatasets (GDALDatasetH **hDS, int *pnCount)
     Fetch all open GDAL dataset handles. 
 int     GDALGetAccess (GDALDatasetH hDS)
@@ -423,16 +639,24 @@ GDALDatasetCopyWholeRaster.restype = c_int
 GDALDatasetCopyWholeRaster.argtypes = [gdal_dataset_h, gdal_dataset_h, c_char_p_p, GDAL_PROGRESS_FUNC, c_void_p]
 GDALDatasetCopyWholeRaster.errcheck = cplerr_errcheck
 
+GDALRasterBandCopyWholeRaster = _libgdal.GDALRasterBandCopyWholeRaster
+GDALRasterBandCopyWholeRaster.restype = c_int
+GDALRasterBandCopyWholeRaster.argtypes = [gdal_rasterband_h, gdal_rasterband_h, c_char_p_p, GDAL_PROGRESS_FUNC, c_void_p]
+GDALRasterBandCopyWholeRaster.errcheck = cplerr_errcheck
+
 
 """
 CPLErr  GDALDatasetCopyWholeRaster (GDALDatasetH hSrcDS, GDALDatasetH hDstDS, char **papszOptions, GDALProgressFunc pfnProgress, void *pProgressData)
     Copy all dataset raster data. 
 CPLErr  GDALRasterBandCopyWholeRaster (GDALRasterBandH hSrcBand, GDALRasterBandH hDstBand, char **papszOptions, GDALProgressFunc pfnProgress, void *pProgressData)
     Copy all raster band raster data. 
-CPLErr  GDALRegenerateOverviews (GDALRasterBandH hSrcBand, int nOverviewCount, GDALRasterBandH *pahOverviewBands, const char *pszResampling, GDALProgressFunc pfnProgress, void *pProgressData)
-    Generate downsampled overviews. 
 """
 
+GDALRegenerateOverviews = _libgdal.GDALRegenerateOverviews
+GDALRegenerateOverviews.restype = c_int
+GDALRegenerateOverviews.argtypes = [gdal_rasterband_h, c_int, POINTER(gdal_rasterband_h), c_char_p, GDAL_PROGRESS_FUNC, c_void_p]
+GDALRegenerateOverviews.errcheck = cplerr_errcheck
+
 GDALGetRasterDataType = _libgdal.GDALGetRasterDataType
 GDALGetRasterDataType.restype = c_int
 GDALGetRasterDataType.argtypes = [gdal_rasterband_h]
@@ -441,16 +665,21 @@ GDALGetBlockSize = _libgdal.GDALGetBlockSize
 GDALGetBlockSize.argtypes = [gdal_rasterband_h, POINTER(c_int), POINTER(c_int)]
 
 
-""" 
-CPLErr  GDALRasterAdviseRead (GDALRasterBandH hRB, int nDSXOff, int nDSYOff, int nDSXSize, int nDSYSize, int nBXSize, int nBYSize, GDALDataType eBDataType, char **papszOptions)
-    Advise driver of upcoming read requests. 
-"""
+GDALRasterAdviseRead = _libgdal.GDALRasterAdviseRead
+GDALRasterAdviseRead.restype = c_int
+GDALRasterAdviseRead.argtypes = [gdal_rasterband_h, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_char_p_p]
+GDALRasterAdviseRead.errcheck = cplerr_errcheck
 
 GDALRasterIO = _libgdal.GDALRasterIO
 GDALRasterIO.restype = c_int
 GDALRasterIO.argtypes = [gdal_rasterband_h, c_int, c_int, c_int, c_int, c_int, c_void_p, c_int, c_int, c_int, c_int, c_int]
 GDALRasterIO.errcheck = cplerr_errcheck
 
+GDALRasterIOEx = _libgdal.GDALRasterIOEx
+GDALRasterIOEx.restype = c_int
+GDALRasterIOEx.argtypes = [gdal_rasterband_h, c_int, c_int, c_int, c_int, c_int, c_void_p, c_int, c_int, c_int, c_gintbig, c_gintbig, POINTER(GDALRasterIOExtraArg)]
+GDALRasterIOEx.errcheck = cplerr_errcheck
+
 GDALReadBlock = _libgdal.GDALReadBlock
 GDALReadBlock.restype = c_int
 GDALReadBlock.argtypes = [gdal_rasterband_h, c_int, c_int, c_void_p]
@@ -536,11 +765,14 @@ GDALGetRasterMaximum = _libgdal.GDALGetRasterMaximum
 GDALGetRasterMaximum.restype = c_double
 GDALGetRasterMaximum.argtypes = [gdal_rasterband_h, POINTER(c_int)]
 
+GDALComputeRasterStatistics = _libgdal.GDALComputeRasterStatistics
+GDALComputeRasterStatistics.restype = c_int
+GDALComputeRasterStatistics.argtypes = [gdal_rasterband_h, c_int, POINTER(c_double), POINTER(c_double), POINTER(c_double), POINTER(c_double), GDAL_PROGRESS_FUNC, c_void_p]
+GDALComputeRasterStatistics.errcheck = cplerr_errcheck
+
 """
 CPLErr  GDALGetRasterStatistics (GDALRasterBandH, int bApproxOK, int bForce, double *pdfMin, double *pdfMax, double *pdfMean, double *pdfStdDev)
     Fetch image statistics. 
-CPLErr  GDALComputeRasterStatistics (GDALRasterBandH, int bApproxOK, double *pdfMin, double *pdfMax, double *pdfMean, double *pdfStdDev, GDALProgressFunc pfnProgress, void *pProgressData)
-    Compute image statistics. 
 CPLErr  GDALSetRasterStatistics (GDALRasterBandH hBand, double dfMin, double dfMax, double dfMean, double dfStdDev)
     Set statistics on band. 
 """
@@ -572,18 +804,25 @@ GDALSetRasterScale.restype = c_int
 GDALSetRasterScale.argtypes = [gdal_rasterband_h, c_double]
 GDALSetRasterScale.errcheck = cplerr_errcheck
 
+GDALComputeRasterMinMax = _libgdal.GDALComputeRasterMinMax
+GDALComputeRasterMinMax.argtypes = [gdal_rasterband_h, c_int, POINTER(c_double)]
+
+GDALGetRasterHistogramEx = _libgdal.GDALGetRasterHistogramEx
+GDALGetRasterHistogramEx.restype = c_int
+GDALGetRasterHistogramEx.argtypes = [gdal_rasterband_h, c_double, c_double, c_int, POINTER(c_ulonglong), c_int, c_int, GDAL_PROGRESS_FUNC, c_void_p]
+GDALGetRasterHistogramEx.errcheck = cplerr_errcheck
+
+GDALGetRandomRasterSample = _libgdal.GDALGetRandomRasterSample
+GDALGetRandomRasterSample.restype = c_int
+GDALGetRandomRasterSample.argtypes = [gdal_rasterband_h, c_int, POINTER(c_float)]
+
 """
-void    GDALComputeRasterMinMax (GDALRasterBandH hBand, int bApproxOK, double adfMinMax[2])
-    Compute the min/max values for a band. 
 CPLErr  GDALFlushRasterCache (GDALRasterBandH hBand)
     Flush raster data cache. 
-CPLErr  GDALGetRasterHistogram (GDALRasterBandH hBand, double dfMin, double dfMax, int nBuckets, int *panHistogram, int bIncludeOutOfRange, int bApproxOK, GDALProgressFunc pfnProgress, void *pProgressData)
-    Compute raster histogram. 
 CPLErr  GDALGetDefaultHistogram (GDALRasterBandH hBand, double *pdfMin, double *pdfMax, int *pnBuckets, int **ppanHistogram, int bForce, GDALProgressFunc pfnProgress, void *pProgressData)
     Fetch default raster histogram. 
 CPLErr  GDALSetDefaultHistogram (GDALRasterBandH hBand, double dfMin, double dfMax, int nBuckets, int *panHistogram)
     Set default histogram. 
-int     GDALGetRandomRasterSample (GDALRasterBandH, int, float *)
 GDALRasterBandH     GDALGetRasterSampleOverview (GDALRasterBandH, int)
     Fetch best sampling overview. 
 """
@@ -594,7 +833,6 @@ GDALFillRaster.argtypes = [gdal_rasterband_h, c_double, c_double]
 GDALFillRaster.errcheck = cplerr_errcheck
 
 """
-CPLErr  GDALComputeBandStats (GDALRasterBandH hBand, int nSampleStep, double *pdfMean, double *pdfStdDev, GDALProgressFunc pfnProgress, void *pProgressData)
 CPLErr  GDALOverviewMagnitudeCorrection (GDALRasterBandH hBaseBand, int nOverviewCount, GDALRasterBandH *pahOverviews, GDALProgressFunc pfnProgress, void *pProgressData)
 GDALRasterAttributeTableH   GDALGetDefaultRAT (GDALRasterBandH hBand)
     Fetch default Raster Attribute Table. 
@@ -617,10 +855,18 @@ GDALCreateMaskBand.restype = c_int
 GDALCreateMaskBand.argtypes = [gdal_rasterband_h, c_int]
 GDALCreateMaskBand.errcheck = cplerr_errcheck
 
+GDALARGetNextUpdatedRegion = _libgdal.GDALARGetNextUpdatedRegion
+GDALARGetNextUpdatedRegion.restype = c_int
+GDALARGetNextUpdatedRegion.argtypes = [gdal_async_reader_h, c_double, POINTER(c_int), POINTER(c_int), POINTER(c_int), POINTER(c_int)]
+
+GDALARLockBuffer = _libgdal.GDALARLockBuffer
+GDALARLockBuffer.restype = c_int
+GDALARLockBuffer.argtypes = [gdal_async_reader_h, c_double]
+
+GDALARUnlockBuffer = _libgdal.GDALARUnlockBuffer
+GDALARUnlockBuffer.argtypes = [gdal_async_reader_h]
+
 """
-GDALAsyncStatusType     GDALARGetNextUpdatedRegion (GDALAsyncReaderH hARIO, double dfTimeout, int *pnXBufOff, int *pnYBufOff, int *pnXBufSize, int *pnYBufSize)
-int     GDALARLockBuffer (GDALAsyncReaderH hARIO, double dfTimeout)
-void    GDALARUnlockBuffer (GDALAsyncReaderH hARIO)
 int     GDALGeneralCmdLineProcessor (int nArgc, char ***ppapszArgv, int nOptions)
     General utility option processing. 
 void    GDALSwapWords (void *pData, int nWordSize, int nWordCount, int nWordSkip)
@@ -749,24 +995,41 @@ int     GDALGetCacheMax (void)
     Get maximum cache memory. 
 int     GDALGetCacheUsed (void)
     Get cache memory used. 
-void    GDALSetCacheMax64 (GIntBig nBytes)
-    Set maximum cache memory. 
-GIntBig     GDALGetCacheMax64 (void)
-    Get maximum cache memory. 
-GIntBig     GDALGetCacheUsed64 (void)
-    Get cache memory used. 
-int     GDALFlushCacheBlock (void)
-    Try to flush one cached raster block. 
-CPLVirtualMem *     GDALDatasetGetVirtualMem (GDALDatasetH hDS, GDALRWFlag eRWFlag, int nXOff, int nYOff, int nXSize, int nYSize, int nBufXSize, int nBufYSize, GDALDataType eBufType, int nBandCount, int *panBandMap, int nPixelSpace, GIntBig nLineSpace, GIntBig nBandSpace, size_t nCacheSize, size_t nPageSizeHint, int bSingleThreadUsage, char **papszOptions)
-    Create a CPLVirtualMem object from a GDAL dataset object. 
-CPLVirtualMem *     GDALRasterBandGetVirtualMem (GDALRasterBandH hBand, GDALRWFlag eRWFlag, int nXOff, int nYOff, int nXSize, int nYSize, int nBufXSize, int nBufYSize, GDALDataType eBufType, int nPixelSpace, GIntBig nLineSpace, size_t nCacheSize, size_t nPageSizeHint, int bSingleThreadUsage, char **papszOptions)
-    Create a CPLVirtualMem object from a GDAL raster band object. 
-CPLVirtualMem *     GDALGetVirtualMemAuto (GDALRasterBandH hBand, GDALRWFlag eRWFlag, int *pnPixelSpace, GIntBig *pnLineSpace, char **papszOptions)
-    Create a CPLVirtualMem object from a GDAL raster band object. 
-CPLVirtualMem *     GDALDatasetGetTiledVirtualMem (GDALDatasetH hDS, GDALRWFlag eRWFlag, int nXOff, int nYOff, int nXSize, int nYSize, int nTileXSize, int nTileYSize, GDALDataType eBufType, int nBandCount, int *panBandMap, GDALTileOrganization eTileOrganization, size_t nCacheSize, int bSingleThreadUsage, char **papszOptions)
-    Create a CPLVirtualMem object from a GDAL dataset object, with tiling organization. 
-CPLVirtualMem *     GDALRasterBandGetTiledVirtualMem (GDALRasterBandH hBand, GDALRWFlag eRWFlag, int nXOff, int nYOff, int nXSize, int nYSize, int nTileXSize, int nTileYSize, GDALDataType eBufType, size_t nCacheSize, int bSingleThreadUsage, char **papszOptions)
-    Create a CPLVirtualMem object from a GDAL rasterband object, with tiling organization. 
 """
 
+GDALSetCacheMax64 = _libgdal.GDALSetCacheMax64
+GDALSetCacheMax64.argtypes = [c_gintbig]
+
+GDALGetCacheMax64 = _libgdal.GDALGetCacheMax64
+GDALGetCacheMax64.restype = c_gintbig
+
+GDALGetCacheUsed64 = _libgdal.GDALGetCacheUsed64
+GDALGetCacheUsed64.restype = c_gintbig
+
+GDALFlushCacheBlock = _libgdal.GDALFlushCacheBlock
+GDALFlushCacheBlock.restype = c_int
+
+GDALDatasetGetVirtualMem = _libgdal.GDALDatasetGetVirtualMem
+GDALDatasetGetVirtualMem.restype = cpl_virtual_mem_h
+GDALDatasetGetVirtualMem.argtypes = [gdal_dataset_h, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_int, POINTER(c_int), c_int, c_gintbig, c_gintbig, c_size_t, c_size_t, c_int, c_char_p_p]
+GDALDatasetGetVirtualMem.errcheck = null_errcheck
+
+GDALRasterBandGetVirtualMem = _libgdal.GDALRasterBandGetVirtualMem
+GDALRasterBandGetVirtualMem.restype = cpl_virtual_mem_h
+GDALRasterBandGetVirtualMem.argtypes = [gdal_rasterband_h, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_gintbig, c_size_t, c_size_t, c_int, c_char_p_p]
+GDALRasterBandGetVirtualMem.errcheck = null_errcheck
+
+# returns NULL for formats without a raw file layout, which is not an error
+GDALGetVirtualMemAuto = _libgdal.GDALGetVirtualMemAuto
+GDALGetVirtualMemAuto.restype = cpl_virtual_mem_h
+GDALGetVirtualMemAuto.argtypes = [gdal_rasterband_h, c_int, POINTER(c_int), POINTER(c_gintbig), c_char_p_p]
+
+GDALDatasetGetTiledVirtualMem = _libgdal.GDALDatasetGetTiledVirtualMem
+GDALDatasetGetTiledVirtualMem.restype = cpl_virtual_mem_h
+GDALDatasetGetTiledVirtualMem.argtypes = [gdal_dataset_h, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_int, POINTER(c_int), c_int, c_size_t, c_int, c_char_p_p]
+GDALDatasetGetTiledVirtualMem.errcheck = null_errcheck
 
+GDALRasterBandGetTiledVirtualMem = _libgdal.GDALRasterBandGetTiledVirtualMem
+GDALRasterBandGetTiledVirtualMem.restype = cpl_virtual_mem_h
+GDALRasterBandGetTiledVirtualMem.argtypes = [gdal_rasterband_h, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_int, c_size_t, c_int, c_char_p_p]
+GDALRasterBandGetTiledVirtualMem.errcheck = null_errcheck
@@ -0,0 +1,100 @@
+""" Process based parallel processing of datasets, block by block.
+"""
+
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pygdal.gdal import Dataset
+
+
+# datasets opened by a worker process, keyed by their open arguments
+_worker_datasets = {}
+
+
+def _worker_dataset(open_args):
+    try:
+        return _worker_datasets[open_args]
+    except KeyError:
+        name, mode, options = open_args
+        # a shared handle could be the one inherited from a forked parent,
+        # whose file descriptor must not be used concurrently
+        dataset = Dataset.open(name, mode, shared=False, options=options)
+        _worker_datasets[open_args] = dataset
+        return dataset
+
+
+def _process_block(func, open_args, window, bands):
+    data = _worker_dataset(open_args).read(*window, bands=bands)
+    return func(data, window)
+
+
+def _open_args(dataset):
+    if not dataset._open_args:
+        raise ValueError("Only opened datasets can be processed in parallel.")
+    name, mode, options = dataset._open_args
+    # options are used as a part of the worker cache key
+    if options:
+        options = tuple(sorted(dict(options).items()))
+    return name, mode, options
+
+
+def iter_blocks(func, dataset, bands=None, windows=None, workers=None, chunksize=1):
+    """ Applies `func(data, window)` to the blocks of the dataset in a pool
+        of `workers` processes and yields (window, result) tuples in the
+        order of the windows. `data` is a (bands, rows, cols) array of the
+        window. By default the windows of the natural block grid of the first
+        band are used. `func` must be picklable, i.e. defined at module level.
+    """
+    open_args = _open_args(dataset)
+    if windows is None:
+        windows = dataset.bands[1].block_windows()
+    windows = list(windows)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            _process_block, repeat(func), repeat(open_args), windows,
+            repeat(bands), chunksize=chunksize
+        )
+        for window, result in zip(windows, results):
+            yield window, result
+
+
+def map_blocks(func, dataset, out=None, bands=None, windows=None, workers=None,
+               chunksize=1):
+    """ Applies `func(data, window)` to the blocks of the dataset in a pool
+        of processes, see `iter_blocks`. The results are written back in
+        order into `out`, which is either a dataset or a numpy array with the
+        shape (bands, rows, cols) or (rows, cols). Without `out` a list of
+        the results is returned.
+    """
+    blocks = iter_blocks(func, dataset, bands, windows, workers, chunksize)
+
+    if out is None:
+        return [result for _, result in blocks]
+
+    for window, result in blocks:
+        if isinstance(out, Dataset):
+            out.write(np.asarray(result), window.offset_x, window.offset_y)
+        else:
+            out[...,
+                window.offset_y:window.offset_y + window.size_y,
+                window.offset_x:window.offset_x + window.size_x
+            ] = result
+    return out
+
+
+def reduce_blocks(func, combine, dataset, initial=None, bands=None, windows=None,
+                  workers=None, chunksize=1):
+    """ Applies `func(data, window)` to the blocks of the dataset in a pool
+        of processes, see `iter_blocks`, and folds the results in order with
+        `combine(accumulated, result)`.
+    """
+    accumulated = initial
+    for _, result in iter_blocks(func, dataset, bands, windows, workers, chunksize):
+        if accumulated is None:
+            accumulated = result
+        else:
+            accumulated = combine(accumulated, result)
+    return accumulated
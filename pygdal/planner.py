@@ -0,0 +1,103 @@
+""" Coalescing of many small reads into fewer larger ones.
+"""
+
+from pygdal.util import Window
+from pygdal.gdal import _resolve_window
+
+
+class ReadPlanner(object):
+    """ Merges overlapping or nearby windows into fewer, larger reads.
+
+        Two groups of windows are merged when the distance between their
+        bounding boxes is at most `gap` pixels in both directions and the
+        fraction of the merged bounding box not covered by any of the
+        windows is at most `waste`. The covered area is estimated by the sum
+        of the window areas, so overlaps are counted twice.
+    """
+
+    def __init__(self, gap=0, waste=0.25):
+        self.gap = gap
+        self.waste = waste
+
+    def plan(self, windows):
+        """ Returns a list of (window, indices) tuples, with the merged
+            windows to read and the indices of the windows they contain.
+        """
+        groups = []
+        for index, window in enumerate(windows):
+            offset_x, offset_y, size_x, size_y = window
+            groups.append((
+                (offset_x, offset_y, offset_x + size_x, offset_y + size_y),
+                size_x * size_y, [index]
+            ))
+
+        # sweep over the groups ordered by their top edge, only comparing
+        # each with the earlier ones reaching down to within `gap` pixels of
+        # it, until a sweep merges nothing more
+        merged = True
+        while merged:
+            merged = False
+            groups.sort(key=lambda group: (group[0][1], group[0][0]))
+            swept, active = [], []
+            for group in groups:
+                min_y = group[0][1]
+                active = [
+                    i for i in active if swept[i][0][3] + self.gap >= min_y
+                ]
+                for i in active:
+                    combined = self._merge(swept[i], group)
+                    if combined:
+                        swept[i] = combined
+                        merged = True
+                        break
+                else:
+                    active.append(len(swept))
+                    swept.append(group)
+            groups = swept
+
+        return [
+            (Window(min_x, min_y, max_x - min_x, max_y - min_y), sorted(indices))
+            for (min_x, min_y, max_x, max_y), _, indices in groups
+        ]
+
+    def _merge(self, group_a, group_b):
+        (a_min_x, a_min_y, a_max_x, a_max_y), a_area, a_indices = group_a
+        (b_min_x, b_min_y, b_max_x, b_max_y), b_area, b_indices = group_b
+
+        gap_x = max(a_min_x, b_min_x) - min(a_max_x, b_max_x)
+        gap_y = max(a_min_y, b_min_y) - min(a_max_y, b_max_y)
+        if gap_x > self.gap or gap_y > self.gap:
+            return None
+
+        bbox = (
+            min(a_min_x, b_min_x), min(a_min_y, b_min_y),
+            max(a_max_x, b_max_x), max(a_max_y, b_max_y)
+        )
+        bbox_area = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+        area = a_area + b_area
+        if bbox_area and 1.0 - min(1.0, float(area) / bbox_area) > self.waste:
+            return None
+
+        return bbox, area, a_indices + b_indices
+
+    def read(self, raster, windows, **kwargs):
+        """ Reads the windows from the band or dataset with as few reads as
+            the plan allows and returns one array per window, in order. The
+            arrays are views of the merged reads. Further keyword arguments
+            are passed to `read`, datasets must be read band interleaved.
+        """
+        windows = [_resolve_window(raster, *window) for window in windows]
+        arrays = [None] * len(windows)
+
+        for merged, indices in self.plan(windows):
+            data = raster.read(*merged, **kwargs)
+            for index in indices:
+                offset_x, offset_y, size_x, size_y = windows[index]
+                offset_x -= merged.offset_x
+                offset_y -= merged.offset_y
+                arrays[index] = data[
+                    ...,
+                    offset_y:offset_y + size_y,
+                    offset_x:offset_x + size_x
+                ]
+        return arrays
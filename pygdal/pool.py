@@ -0,0 +1,146 @@
+""" A pool of open dataset handles for services touching many datasets.
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+
+from pygdal.gdal import Dataset
+from pygdal.libgdal import GA_ReadOnly
+
+
+def _pool_key(name, mode, options):
+    if options:
+        options = tuple(sorted(dict(options).items()))
+    return name, mode, options or None
+
+
+class DatasetPool(object):
+    """ Keeps up to `max_open` non-shared dataset handles open, keyed by
+        their path, access mode and open options. A handle is checked out by
+        one thread at a time, so it is never used concurrently. When the
+        limit is reached, the least recently used idle handle is closed. If
+        all handles are in use, checking out waits until one is released.
+    """
+
+    def __init__(self, max_open=64):
+        self.max_open = max_open
+        self._condition = threading.Condition()
+        # idle handles by key, and all idle handles in least recently used
+        # order, referenced by the id of the dataset
+        self._idle = {}
+        self._lru = OrderedDict()
+        # the keys of the handles that are checked out
+        self._checked_out = {}
+        self._open = 0
+        self._closed = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @contextmanager
+    def checkout(self, name, mode=GA_ReadOnly, options=None, timeout=None):
+        """ Context manager checking out a handle of the dataset, which is
+            released back to the pool on exit.
+        """
+        dataset = self.acquire(name, mode, options, timeout)
+        try:
+            yield dataset
+        finally:
+            self.release(dataset)
+
+    def acquire(self, name, mode=GA_ReadOnly, options=None, timeout=None):
+        """ Checks out a handle of the dataset, either an idle one from the
+            pool or a newly opened one. It must be passed to `release` when
+            done.
+        """
+        key = _pool_key(name, mode, options)
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ValueError("The pool is closed.")
+
+                idle = self._idle.get(key)
+                if idle:
+                    dataset = idle.pop()
+                    if not idle:
+                        del self._idle[key]
+                    del self._lru[id(dataset)]
+                    self._checked_out[id(dataset)] = key
+                    self.hits += 1
+                    return dataset
+
+                if self._open < self.max_open:
+                    break
+                elif self._lru:
+                    self._evict()
+                    break
+                elif not self._condition.wait(timeout):
+                    raise RuntimeError(
+                        "Timed out waiting for a free dataset handle."
+                    )
+
+            # reserve the slot, the dataset is opened outside of the lock
+            self._open += 1
+            self.misses += 1
+
+        try:
+            dataset = Dataset.open(name, mode, shared=False, options=options)
+        except:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._checked_out[id(dataset)] = key
+        return dataset
+
+    def release(self, dataset):
+        """ Returns a checked out handle to the pool.
+        """
+        with self._condition:
+            key = self._checked_out.pop(id(dataset))
+            if self._closed or self._open > self.max_open:
+                dataset._close()
+                self._open -= 1
+            else:
+                self._idle.setdefault(key, []).append(dataset)
+                self._lru[id(dataset)] = (key, dataset)
+            self._condition.notify()
+
+    def _evict(self):
+        # closes the least recently used idle handle, the lock must be held
+        _, (key, dataset) = self._lru.popitem(last=False)
+        idle = self._idle[key]
+        idle.remove(dataset)
+        if not idle:
+            del self._idle[key]
+        dataset._close()
+        self._open -= 1
+        self.evictions += 1
+
+    def close(self):
+        """ Closes all idle handles. Handles still checked out are closed
+            when they are released.
+        """
+        with self._condition:
+            self._closed = True
+            while self._lru:
+                self._evict()
+            self._condition.notify_all()
+
+    @property
+    def stats(self):
+        """ A dict with the number of open, idle and checked out handles and
+            the hit, miss and eviction counters.
+        """
+        with self._condition:
+            return {
+                "open": self._open,
+                "idle": len(self._lru),
+                "checked_out": len(self._checked_out),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,174 @@
+""" Streaming statistics over the native blocks of a band.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pygdal.gdal import _ThreadLocalDatasets
+
+
+Statistics = namedtuple("Statistics", ["min", "max", "mean", "std", "count"])
+
+
+class RunningStatistics(object):
+    """ One-pass accumulator of the count, minimum, maximum, mean and
+        variance of values. Batches of values are merged with the parallel
+        variant of Welford's algorithm, so accumulators of separate parts can
+        be merged as well.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """ Adds a batch of values.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not values.size:
+            return
+        mean = values.mean()
+        self._merge(
+            values.size, mean, np.square(values - mean).sum(),
+            values.min(), values.max()
+        )
+
+    def merge(self, other):
+        """ Adds the values accumulated by another instance.
+        """
+        if other.count:
+            self._merge(other.count, other.mean, other.m2, other.min, other.max)
+
+    def _merge(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    @property
+    def variance(self):
+        if not self.count:
+            return np.nan
+        return self.m2 / self.count
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def result(self):
+        if not self.count:
+            return Statistics(np.nan, np.nan, np.nan, np.nan, 0)
+        return Statistics(
+            float(self.min), float(self.max), float(self.mean),
+            float(self.std), self.count
+        )
+
+
+def valid_values(band, window):
+    """ Reads the window of the band and returns its valid values, respecting
+        the mask and nodata value, as a flat float64 array. NaN values are
+        never valid.
+    """
+    data = band.read(*window)
+    if np.iscomplexobj(data):
+        raise ValueError("Statistics of complex bands are not supported.")
+
+    valid = band._valid(window, data)
+    values = (data if valid is None else data[valid]).astype(np.float64).ravel()
+    return values[~np.isnan(values)]
+
+
+def _thread_band(band):
+    # returns a function getting the band from a per-thread dataset handle,
+    # or None if the band does not belong to an opened dataset
+    dataset = band._dataset_ref and band._dataset_ref()
+    if not dataset or not dataset._open_args:
+        return None, None
+
+    datasets = _ThreadLocalDatasets(*dataset._open_args)
+    index = band.index
+    return (lambda: datasets.get().bands[index]), datasets
+
+
+def map_windows(func, bands, windows, workers=None):
+    """ Yields the results of `func(bands, window)` for the windows, where
+        `bands` is a list of bands. With `workers`, the windows are processed
+        in that many threads, each with its own handles of the datasets, and
+        the results are yielded in order.
+    """
+    windows = list(windows)
+    getters = [_thread_band(band) for band in bands]
+
+    if not workers or any(getter is None for getter, _ in getters):
+        for window in windows:
+            yield func(bands, window)
+        return
+
+    def run(window):
+        return func([getter() for getter, _ in getters], window)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(run, windows):
+                yield result
+    finally:
+        for _, datasets in getters:
+            datasets.close()
+
+
+def map_blocks(func, band, workers=None):
+    """ Yields the results of `func(band, window)` for the natural blocks of
+        the band, see `map_windows`.
+    """
+    return map_windows(
+        lambda bands, window: func(bands[0], window),
+        [band], band.block_windows(), workers
+    )
+
+
+def _block_statistics(band, window):
+    statistics = RunningStatistics()
+    statistics.update(valid_values(band, window))
+    return statistics
+
+
+def statistics(band, workers=None):
+    """ Computes the statistics of the band in a single streaming pass over
+        its blocks.
+    """
+    total = RunningStatistics()
+    for statistics in map_blocks(_block_statistics, band, workers):
+        total.merge(statistics)
+    return total.result()
+
+
+def histogram(band, bins=256, range=None, include_out_of_range=False,
+              workers=None):
+    """ Computes the histogram of the band in a single streaming pass over
+        its blocks. Returns the counts and the bin edges like
+        `numpy.histogram`. Without a `range` an additional pass computes the
+        minimum and maximum.
+    """
+    if range is None:
+        result = statistics(band, workers)
+        range = (result.min, result.max)
+    minimum, maximum = range
+
+    def block_histogram(band, window):
+        values = valid_values(band, window)
+        if include_out_of_range:
+            values = np.clip(values, minimum, maximum)
+        return np.histogram(values, bins, range)[0]
+
+    counts = np.zeros(bins, dtype=np.int64)
+    for block_counts in map_blocks(block_histogram, band, workers):
+        counts += block_counts
+    return counts, np.linspace(minimum, maximum, bins + 1)
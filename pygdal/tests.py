@@ -1,15 +1,26 @@
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import threading
 import unittest
 
+import numpy as np
+
+from pygdal.libgdal import GA_Update
+
+
 class TestSequenceFunctions(unittest.TestCase):
 
     def setUp(self):
-        self.seq = range(10)
+        self.seq = list(range(10))
 
     def test_shuffle(self):
         # make sure the shuffled sequence does not lose any elements
         random.shuffle(self.seq)
         self.seq.sort()
-        self.assertEqual(self.seq, range(10))
+        self.assertEqual(self.seq, list(range(10)))
 
         # should raise an exception for an immutable sequence
         self.assertRaises(TypeError, random.shuffle, (1,2,3))
@@ -24,5 +35,907 @@ class TestSequenceFunctions(unittest.TestCase):
         for element in random.sample(self.seq, 5):
             self.assertTrue(element in self.seq)
 
+def create_tiff(path, size_x=100, size_y=80, count=2, options=None):
+    """ Creates a GeoTIFF filled with increasing values and returns its data.
+    """
+    from pygdal.gdal import Driver
+    from pygdal.libgdal import GDT_UInt16
+
+    data = np.arange(count * size_x * size_y, dtype=np.uint16).reshape(
+        count, size_y, size_x
+    )
+    with Driver.by_name("GTiff").create(
+            path, size_x, size_y, count, GDT_UInt16, options) as dataset:
+        dataset.write(data)
+    return data
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.tempdir, name)
+
+
+class TestDatasetOpen(TempDirTestCase):
+    def test_open_str_path(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("open.tif")
+        data = create_tiff(path)
+        for shared in (True, False):
+            with Dataset.open(path, shared=shared) as dataset:
+                self.assertEqual(dataset.path, path)
+                np.testing.assert_array_equal(dataset.read(), data)
+
+    def test_open_with_options(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("options.tif")
+        data = create_tiff(path)
+        with Dataset.open(path, options={"NUM_THREADS": 2}) as dataset:
+            np.testing.assert_array_equal(dataset.read(), data)
+
+
+def create_mem(count=3, size_x=100, size_y=80, data_type=None):
+    """ Creates a MEM dataset filled with increasing values and returns it
+        and its data.
+    """
+    from pygdal.gdal import Driver
+    from pygdal.libgdal import GDT_UInt16
+
+    data = np.arange(count * size_x * size_y, dtype=np.uint16).reshape(
+        count, size_y, size_x
+    )
+    dataset = Driver.by_name("MEM").create(
+        "", size_x, size_y, count, data_type or GDT_UInt16
+    )
+    dataset.write(data)
+    return dataset, data
+
+
+class TestReadWrite(unittest.TestCase):
+    def test_dataset_round_trip(self):
+        dataset, data = create_mem()
+        np.testing.assert_array_equal(dataset.read(), data)
+        np.testing.assert_array_equal(
+            dataset.read(10, 20, 30, 40, bands=[3, 1]),
+            data[[2, 0], 20:60, 10:40]
+        )
+
+        pixel = dataset.read(interleave="pixel")
+        self.assertEqual(pixel.shape, (80, 100, 3))
+        np.testing.assert_array_equal(pixel, data.transpose(1, 2, 0))
+
+        dataset.write(pixel[::-1].copy(), interleave="pixel")
+        np.testing.assert_array_equal(dataset.read(), data[:, ::-1])
+
+
+class TestWriteSequences(unittest.TestCase):
+    def test_write_lists(self):
+        from pygdal.gdal import Driver
+        from pygdal.libgdal import GDT_Int16
+
+        dataset = Driver.by_name("MEM").create("", 2, 2, 2, GDT_Int16)
+        band = dataset.bands[1]
+        band.write([[1, 2], [3, 4]])
+        self.assertEqual(band.read().tolist(), [[1, 2], [3, 4]])
+        self.assertEqual(band.read().dtype, np.int16)
+
+        dataset.write([[[5, 6], [7, 8]], [[9, 10], [11, 12]]])
+        self.assertEqual(
+            dataset.read().tolist(), [[[5, 6], [7, 8]], [[9, 10], [11, 12]]]
+        )
+
+        band.write(np.array([[13, 14], [15, 16]], dtype=np.int64))
+        self.assertEqual(band.read().tolist(), [[13, 14], [15, 16]])
+
+
+class TestAsyncio(TempDirTestCase):
+    def test_executor_in_several_loops(self):
+        import asyncio
+        from pygdal.aio import RasterExecutor
+        from pygdal.gdal import Dataset
+
+        path = self.path("aio.tif")
+        data = create_tiff(path)
+        executor = RasterExecutor(lanes=2, max_pending=1)
+        windows = [(0, 0, 50, 40), (50, 40, 50, 40)]
+
+        async def read_all(dataset):
+            arrays = await asyncio.gather(*[
+                executor.read(dataset, *window) for window in windows
+            ])
+            iterated = [
+                array async for _, array in
+                executor.iter_windows(dataset.bands[2], windows)
+            ]
+            return arrays, iterated
+
+        try:
+            with Dataset.open(path) as dataset:
+                for _ in range(2):
+                    arrays, iterated = asyncio.run(read_all(dataset))
+                    np.testing.assert_array_equal(arrays[0], data[:, :40, :50])
+                    np.testing.assert_array_equal(arrays[1], data[:, 40:, 50:])
+                    np.testing.assert_array_equal(iterated[1], data[1, 40:, 50:])
+        finally:
+            executor.shutdown()
+
+    def test_lanes_spread(self):
+        from pygdal.aio import RasterExecutor
+
+        executor = RasterExecutor(lanes=4)
+        try:
+            datasets = [create_mem(count=1)[0] for _ in range(16)]
+            lanes = set(id(executor._lane(dataset)) for dataset in datasets)
+            self.assertGreater(len(lanes), 2)
+            self.assertIs(
+                executor._lane(datasets[0].bands[1]),
+                executor._lane(datasets[0])
+            )
+        finally:
+            executor.shutdown()
+
+
+class TestDrivers(unittest.TestCase):
+    def test_enumeration(self):
+        from pygdal import drivers
+
+        names = drivers.names()
+        self.assertEqual(len(names), drivers.count())
+        self.assertIn("GTiff", names)
+        self.assertIn("MEM", names)
+
+        driver = drivers.get("GTiff")
+        self.assertEqual(driver.short_name, "GTiff")
+        self.assertEqual(driver.long_name, "GeoTIFF")
+        self.assertIsNone(drivers.get("NoSuchDriver"))
+
+    def test_keep_only_and_restore(self):
+        from pygdal import drivers
+
+        count = drivers.count()
+        drivers.keep_only(["GTiff", "MEM"])
+        try:
+            self.assertEqual(sorted(drivers.names()), ["GTiff", "MEM"])
+        finally:
+            drivers.restore()
+        self.assertEqual(drivers.count(), count)
+
+
+class TestAdviseRead(TempDirTestCase):
+    def test_dataset_iter_windows(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("advise.tif")
+        data = create_tiff(path)
+        windows = [(0, 0, 50, 40), (50, 0, 50, 40), (0, 40, 100, 40)]
+        with Dataset.open(path) as dataset:
+            dataset.advise_read(bands=[2])
+            for (offset_x, offset_y, size_x, size_y), array in \
+                    dataset.iter_windows(windows, prefetch=1):
+                np.testing.assert_array_equal(
+                    array, data[:, offset_y:offset_y + size_y,
+                                offset_x:offset_x + size_x]
+                )
+
+    def test_band_iter_windows(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("advise_band.tif")
+        data = create_tiff(path)
+        with Dataset.open(path) as dataset:
+            band = dataset.bands[1]
+            band.advise_read(10, 10, 20, 20)
+            result = list(band.iter_windows([(0, 0, 10, 10), (90, 70, 10, 10)]))
+            np.testing.assert_array_equal(result[0][1], data[0, :10, :10])
+            np.testing.assert_array_equal(result[1][1], data[0, 70:, 90:])
+
+
+class TestCOG(TempDirTestCase):
+    def test_write_and_validate(self):
+        from pygdal import cog
+        from pygdal.gdal import Dataset
+
+        data = np.arange(3 * 600 * 700, dtype=np.uint16).reshape(3, 600, 700)
+        for in_memory in (True, False):
+            path = self.path("cog_%s.tif" % in_memory)
+            cog.write(
+                data, path, blocksize=256, workers=2, in_memory=in_memory,
+                geotransform=(10, 1, 0, 20, 0, -1)
+            )
+            cog.validate(path, 256, 2)
+
+            with Dataset.open(path) as dataset:
+                band = dataset.bands[1]
+                self.assertEqual(band.block_size, (256, 256))
+                self.assertEqual(len(band.overviews), 2)
+                self.assertEqual(dataset.geotransform, (10, 1, 0, 20, 0, -1))
+                self.assertEqual(
+                    dataset.metadata_item("COMPRESSION", "IMAGE_STRUCTURE"),
+                    "DEFLATE"
+                )
+                np.testing.assert_array_equal(dataset.read(), data)
+
+    def test_write_with_projection(self):
+        from pygdal import cog
+        from pygdal.gdal import Dataset
+
+        data = np.zeros((100, 100), dtype=np.uint8)
+        for in_memory in (True, False):
+            path = self.path("projection_%s.tif" % in_memory)
+            cog.write(
+                data, path, in_memory=in_memory,
+                geotransform=(10, 1, 0, 20, 0, -1),
+                projection='LOCAL_CS["x"]'
+            )
+            with Dataset.open(path) as dataset:
+                self.assertIn('LOCAL_CS["x"', dataset.projection)
+
+    def test_validate_rejects_plain_tiff(self):
+        from pygdal import cog
+
+        path = self.path("plain.tif")
+        create_tiff(path, 1000, 1000, 1)
+        self.assertRaises(ValueError, cog.validate, path)
+
+
+class TestStatistics(TempDirTestCase):
+    def setUp(self):
+        from pygdal.gdal import Driver
+
+        super(TestStatistics, self).setUp()
+        from pygdal.libgdal import GDT_UInt16
+
+        self.data = np.arange(60000, dtype=np.uint16).reshape(200, 300) % 1000
+        self.dataset = Driver.by_name("MEM").create("", 300, 200, 1, GDT_UInt16)
+        self.dataset.write(self.data)
+        self.band = self.dataset.bands[1]
+
+    def test_statistics(self):
+        native = self.band.statistics()
+        streamed = self.band.statistics(native=False)
+        self.assertEqual(streamed.count, self.data.size)
+        self.assertEqual((native.min, native.max), (0, 999))
+        self.assertEqual((streamed.min, streamed.max), (0, 999))
+        self.assertAlmostEqual(native.mean, self.data.mean())
+        self.assertAlmostEqual(streamed.std, self.data.std())
+
+    def test_statistics_leave_metadata(self):
+        from pygdal.gdal import Dataset
+        from pygdal.libgdal import GA_ReadOnly
+
+        path = self.path("statistics.tif")
+        create_tiff(path)
+        for mode in (GA_ReadOnly, GA_Update):
+            with Dataset.open(path, mode, shared=False) as dataset:
+                band = dataset.bands[1]
+                self.assertIsNone(band.metadata_item("STATISTICS_MEAN"))
+                self.assertEqual(band.statistics().min, 0)
+                self.assertIsNone(band.metadata_item("STATISTICS_MEAN"))
+            self.assertEqual(os.listdir(self.tempdir), ["statistics.tif"])
+
+    def test_histogram_parity(self):
+        for kwargs in ({"bins": 4}, {"bins": 7, "range": (100, 500)},
+                       {"bins": 5, "range": (100, 500),
+                        "include_out_of_range": True}):
+            native, edges = self.band.histogram(**kwargs)
+            streamed, _ = self.band.histogram(native=False, **kwargs)
+            np.testing.assert_array_equal(native, streamed)
+
+            data = self.data
+            range = kwargs.get("range", (0, 999))
+            if kwargs.get("include_out_of_range"):
+                data = np.clip(data, *range)
+            expected, expected_edges = np.histogram(data, kwargs["bins"], range)
+            np.testing.assert_array_equal(native, expected)
+            np.testing.assert_allclose(edges, expected_edges)
+
+        self.assertEqual(self.band.histogram(bins=4)[0].sum(), self.data.size)
+
+
+class TestTileCache(unittest.TestCase):
+    def create(self, value):
+        from pygdal.gdal import Driver
+
+        dataset = Driver.by_name("MEM").create("", 64, 64)
+        dataset.bands[1].fill(value)
+        return dataset
+
+    def test_datasets_do_not_share_entries(self):
+        from pygdal.tilecache import TileCache
+
+        cache = TileCache(1024 * 1024)
+        first, second = self.create(1), self.create(2)
+        self.assertEqual(first.bands[1].read(cache=cache)[0, 0], 1)
+        self.assertEqual(second.bands[1].read(cache=cache)[0, 0], 2)
+        self.assertEqual(first.bands[1].read(cache=cache)[0, 0], 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_write_invalidates(self):
+        from pygdal.tilecache import TileCache
+
+        cache = TileCache(1024 * 1024)
+        dataset = self.create(47)
+        band = dataset.bands[1]
+        self.assertEqual(band.read(cache=cache)[0, 0], 47)
+
+        band.write(np.full((64, 64), 77, dtype=np.uint8))
+        self.assertEqual(band.read(cache=cache)[0, 0], 77)
+
+        dataset.write(np.full((64, 64), 88, dtype=np.uint8))
+        self.assertEqual(band.read(cache=cache)[0, 0], 88)
+
+        dataset._close()
+        self.assertEqual(len(cache), 0)
+
+    def test_eviction(self):
+        from pygdal.tilecache import TileCache
+
+        array = np.zeros(100, dtype=np.uint8)
+        cache = TileCache(250)
+        for key in range(3):
+            cache.put(key, array.copy(), "source")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.bytes, 200)
+        self.assertIsNone(cache.get(0))
+
+        cache.invalidate("source")
+        self.assertEqual((len(cache), cache.bytes), (0, 0))
+
+
+class TestZonalStatistics(unittest.TestCase):
+    def test_sparse_labels(self):
+        from pygdal.gdal import Driver
+        from pygdal.libgdal import GDT_Float32, GDT_Int32
+        from pygdal.zonal import zonal_statistics
+
+        values = np.random.RandomState(0).rand(200, 300).astype(np.float32)
+        labels = np.zeros((200, 300), dtype=np.int32)
+        labels[50:, :] = 7
+        labels[150:, 100:] = -1
+        labels[0, 0] = 187500000
+
+        mem = Driver.by_name("MEM")
+        values_ds = mem.create("", 300, 200, 1, GDT_Float32)
+        values_ds.write(values)
+        labels_ds = mem.create("", 300, 200, 1, GDT_Int32)
+        labels_ds.write(labels)
+
+        for workers in (None, 2):
+            result = zonal_statistics(
+                values_ds.bands[1], labels_ds.bands[1], workers
+            )
+            self.assertEqual(list(result.labels), [0, 7, 187500000])
+            for i, label in enumerate(result.labels):
+                expected = values[labels == label].astype(np.float64)
+                self.assertEqual(result.count[i], expected.size)
+                self.assertAlmostEqual(result.sum[i], expected.sum(), 3)
+                self.assertAlmostEqual(result.mean[i], expected.mean())
+                self.assertAlmostEqual(result.std[i], expected.std())
+                self.assertEqual(result.min[i], expected.min())
+                self.assertEqual(result.max[i], expected.max())
+
+
+class TestConfigOptions(unittest.TestCase):
+    def test_thread_local(self):
+        from pygdal.gdal import config_options
+        from pygdal.libgdal import CPLGetConfigOption
+
+        seen = []
+
+        def other_thread():
+            seen.append(CPLGetConfigOption(b"PYGDAL_TEST_OPTION", None))
+
+        with config_options(PYGDAL_TEST_OPTION="YES"):
+            self.assertEqual(
+                CPLGetConfigOption(b"PYGDAL_TEST_OPTION", None), b"YES"
+            )
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [None])
+        self.assertIsNone(CPLGetConfigOption(b"PYGDAL_TEST_OPTION", None))
+
+
+def block_sum(data, window):
+    return int(data.sum())
+
+
+def block_double(data, window):
+    return data * 2
+
+
+class TestParallel(TempDirTestCase):
+    def test_pickle_window_and_geotransform(self):
+        from pygdal.util import Window, GeoTransform
+
+        window = Window(1, 2, 3, 4)
+        self.assertEqual(pickle.loads(pickle.dumps(window)), window)
+        self.assertIsInstance(pickle.loads(pickle.dumps(window)), Window)
+
+        geotransform = GeoTransform(10, 2, 0, 20, 0, -2)
+        geotransform.inverted()
+        self.assertEqual(
+            pickle.loads(pickle.dumps(geotransform)), geotransform
+        )
+
+    def test_pickle_dataset(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("pickle.tif")
+        data = create_tiff(path)
+        with Dataset.open(path) as dataset:
+            with pickle.loads(pickle.dumps(dataset)) as copy:
+                np.testing.assert_array_equal(copy.read(), data)
+
+    def test_map_blocks_process_pool(self):
+        from pygdal.gdal import Dataset
+        from pygdal.parallel import map_blocks, reduce_blocks
+
+        path = self.path("blocks.tif")
+        data = create_tiff(
+            path, options={"TILED": True, "BLOCKXSIZE": 32, "BLOCKYSIZE": 32}
+        )
+        with Dataset.open(path) as dataset:
+            out = np.zeros(data.shape, dtype=np.int64)
+            map_blocks(block_double, dataset, out=out, workers=2)
+            np.testing.assert_array_equal(out, data * 2)
+
+            total = reduce_blocks(
+                block_sum, lambda a, b: a + b, dataset, workers=2
+            )
+            self.assertEqual(total, int(data.sum()))
+
+
+class TestBandReadWrite(unittest.TestCase):
+    def test_band_round_trip(self):
+        dataset, data = create_mem()
+        band = dataset.bands[2]
+        np.testing.assert_array_equal(band.read(), data[1])
+        np.testing.assert_array_equal(band.read(5, 6, 7, 8), data[1, 6:14, 5:12])
+
+        band.write(np.ones((2, 3), dtype=np.uint16), 4, 5)
+        np.testing.assert_array_equal(band.read(4, 5, 3, 2), np.ones((2, 3)))
+
+        self.assertRaises(ValueError, band.read, 90, 0, 20, 10)
+
+    def test_strided_views(self):
+        dataset, data = create_mem()
+        mosaic = np.zeros((100, 200), dtype=np.uint16)
+        dataset.bands[1].read(array=mosaic[10:90, 50:150])
+        np.testing.assert_array_equal(mosaic[10:90, 50:150], data[0])
+
+        rgb = np.zeros((80, 100, 3), dtype=np.uint16)
+        for index in range(3):
+            dataset.bands[index + 1].read(array=rgb[..., index])
+        np.testing.assert_array_equal(rgb, data.transpose(1, 2, 0))
+
+        dataset.bands[1].write(data[2, :, ::2], 0, 0)
+        np.testing.assert_array_equal(
+            dataset.bands[1].read(0, 0, 50, 80), data[2, :, ::2]
+        )
+
+        self.assertRaises(
+            ValueError, dataset.bands[1].read,
+            array=np.zeros((80, 100), dtype=np.uint16)[::-1]
+        )
+
+    def test_byte_order(self):
+        dataset, _ = create_mem(count=1, size_x=10, size_y=10)
+        band = dataset.bands[1]
+        data = np.arange(100, dtype=">u2").reshape(10, 10)
+        band.write(data)
+        np.testing.assert_array_equal(band.read(), np.arange(100).reshape(10, 10))
+
+        dataset.write(data[np.newaxis])
+        np.testing.assert_array_equal(dataset.read()[0], data)
+
+        self.assertRaises(
+            ValueError, band.read, array=np.zeros((10, 10), dtype=">u2")
+        )
+        self.assertRaises(ValueError, band.read, dtype=">u2")
+
+
+class TestBlocks(TempDirTestCase):
+    def test_block_iteration(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("blocks.tif")
+        data = create_tiff(
+            path, options={"TILED": True, "BLOCKXSIZE": 32, "BLOCKYSIZE": 32}
+        )
+        with Dataset.open(path) as dataset:
+            band = dataset.bands[1]
+            self.assertEqual(band.block_size, (32, 32))
+            windows = list(band.block_windows())
+            self.assertEqual(len(windows), 4 * 3)
+            self.assertEqual(windows[-1], (96, 64, 4, 16))
+
+            for reuse in (False, True):
+                covered = np.zeros(data[0].shape, dtype=np.uint16)
+                for (offset_x, offset_y, size_x, size_y), array in \
+                        band.iter_blocks(reuse=reuse):
+                    self.assertEqual(array.shape, (size_y, size_x))
+                    covered[offset_y:offset_y + size_y,
+                            offset_x:offset_x + size_x] = array
+                np.testing.assert_array_equal(covered, data[0])
+
+
+class TestReadWindows(TempDirTestCase):
+    def test_read_windows_in_threads(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("windows.tif")
+        data = create_tiff(path)
+        windows = [(0, 0, 10, 10), (90, 70, 10, 10), (20, 30, 40, 10)]
+        with Dataset.open(path) as dataset:
+            arrays = dataset.read_windows(windows, workers=3)
+        for (offset_x, offset_y, size_x, size_y), array in zip(windows, arrays):
+            np.testing.assert_array_equal(
+                array,
+                data[:, offset_y:offset_y + size_y, offset_x:offset_x + size_x]
+            )
+
+
+class TestMemmap(TempDirTestCase):
+    def test_memmap(self):
+        dataset, data = create_mem(count=2)
+        array = dataset.bands[1].as_memmap()
+        np.testing.assert_array_equal(array, data[0])
+
+        array = dataset.as_memmap(10, 10, 20, 20)
+        np.testing.assert_array_equal(array, data[:, 10:30, 10:30])
+
+    def test_memmap_outlives_close(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("memmap.tif")
+        data = create_tiff(path, size_x=300, size_y=300, count=1)
+        with Dataset.open(path, shared=False) as dataset:
+            band_array = dataset.bands[1].as_memmap()
+            dataset_array = dataset.as_memmap()
+
+        self.assertIsNone(dataset._handle)
+        self.assertEqual(band_array[299, 299], data[0, 299, 299])
+        np.testing.assert_array_equal(dataset_array, data)
+
+        del band_array, dataset_array
+        self.assertIsNone(dataset._deferred_handle)
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_block_cache_control(self):
+        from pygdal import cache
+
+        with cache.cache_max(16 * 1024 * 1024):
+            self.assertEqual(cache.get_max(), 16 * 1024 * 1024)
+            self.assertIn("used", cache.stats())
+
+
+class TestDecimatedReads(TempDirTestCase):
+    def test_read_decimated(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("decimated.tif")
+        create_tiff(path, 256, 256, 1)
+        with Dataset.open(path, GA_Update) as dataset:
+            dataset.build_overviews([2, 4], "average")
+
+        with Dataset.open(path) as dataset:
+            band = dataset.bands[1]
+            decimated = band.read(out_shape=(64, 64))
+            np.testing.assert_array_equal(decimated, band.overviews[1].read())
+            self.assertEqual(
+                dataset.read(out_shape=(128, 128)).shape, (1, 128, 128)
+            )
+
+
+class TestOverviews(TempDirTestCase):
+    def test_build_overviews(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("overviews.tif")
+        create_tiff(path, 256, 256, 1)
+        progress = []
+        with Dataset.open(path, GA_Update) as dataset:
+            dataset.build_overviews(
+                [2, 4], "average",
+                progress=lambda complete, message: progress.append(complete),
+                workers=2
+            )
+        self.assertEqual(progress[-1], 1.0)
+
+        with Dataset.open(path) as dataset:
+            self.assertEqual(
+                [(overview.size_x, overview.size_y)
+                 for overview in dataset.bands[1].overviews],
+                [(128, 128), (64, 64)]
+            )
+
+    def test_cancel(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("cancel.tif")
+        create_tiff(path, 256, 256, 1)
+        with Dataset.open(path, GA_Update) as dataset:
+            self.assertRaises(
+                Exception, dataset.build_overviews, [2],
+                progress=lambda complete, message: False
+            )
+
+
+class TestGeoTransform(unittest.TestCase):
+    def test_transformations(self):
+        from pygdal.util import GeoTransform
+
+        geotransform = GeoTransform(100, 10, 0, 200, 0, -10)
+        xs, ys = geotransform.forward([0, 5], [0, 5])
+        np.testing.assert_allclose(xs, [100, 150])
+        np.testing.assert_allclose(ys, [200, 150])
+        xs, ys = geotransform.inverse(xs, ys)
+        np.testing.assert_allclose(xs, [0, 5])
+        np.testing.assert_allclose(ys, [0, 5])
+
+        self.assertEqual(geotransform.window(120, 150, 150, 180), (2, 2, 3, 3))
+        self.assertEqual(
+            geotransform.window(0, 0, 1000, 1000, size=(8, 8)), (0, 0, 8, 8)
+        )
+        self.assertEqual(
+            geotransform.extent((2, 2, 3, 3)), (120, 150, 150, 180)
+        )
+        self.assertEqual(
+            geotransform.compose(geotransform.inverted()),
+            GeoTransform()
+        )
+
+    def test_matches_gdal(self):
+        from pygdal.libgdal import (
+            gdal_geotransform_type, GDALInvGeoTransform,
+            GDALComposeGeoTransforms
+        )
+        from pygdal.util import GeoTransform
+
+        first = GeoTransform(100, 10, 2, 200, 1, -10)
+        second = GeoTransform(-5, 0.5, 0.25, 3, 0.1, 2)
+
+        inverted = gdal_geotransform_type()
+        self.assertTrue(
+            GDALInvGeoTransform(gdal_geotransform_type(*first), inverted)
+        )
+        np.testing.assert_allclose(first.inverted(), tuple(inverted))
+
+        composed = gdal_geotransform_type()
+        GDALComposeGeoTransforms(
+            gdal_geotransform_type(*first), gdal_geotransform_type(*second),
+            composed
+        )
+        np.testing.assert_allclose(first.compose(second), tuple(composed))
+
+
+class TestSample(unittest.TestCase):
+    def test_sample(self):
+        dataset, data = create_mem(count=2)
+        dataset.geotransform = (100, 10, 0, 200, 0, -10)
+        values = dataset.sample([105, 195, 5000], [195, 125, 0])
+        np.testing.assert_array_equal(
+            values, [[data[0, 0, 0], data[1, 0, 0]],
+                     [data[0, 7, 9], data[1, 7, 9]],
+                     [0, 0]]
+        )
+        masked = dataset.sample([105, 5000], [195, 0], masked=True)
+        self.assertEqual(masked.mask.tolist(), [[False, False], [True, True]])
+
+    def test_sample_nodata_data_type(self):
+        from pygdal.gdal import Driver
+        from pygdal.libgdal import GDT_Byte, GDT_Float32
+
+        dataset = Driver.by_name("MEM").create("", 10, 10, 2, GDT_Byte)
+        dataset.bands[1].nodata = -1
+        dataset.write(np.full((2, 10, 10), 200, dtype=np.uint8))
+        values = dataset.sample([5, 50], [5, 50], crs_coords=False)
+        self.assertEqual(values.dtype, np.int16)
+        self.assertEqual(values.tolist(), [[200, 200], [-1, 0]])
+
+        dataset = Driver.by_name("MEM").create("", 10, 10, 1, GDT_Float32)
+        dataset.bands[1].nodata = 0.25
+        dataset.write(np.full((1, 10, 10), 0.5, dtype=np.float32))
+        values = dataset.sample([5, 50], [5, 50], crs_coords=False)
+        self.assertEqual(values.dtype, np.float32)
+        self.assertEqual(values.tolist(), [[0.5], [0.25]])
+
+
+class TestPlanner(unittest.TestCase):
+    def test_plan_and_read(self):
+        from pygdal.planner import ReadPlanner
+
+        dataset, data = create_mem()
+        planner = ReadPlanner(gap=2)
+        windows = [(0, 0, 10, 10), (10, 0, 10, 10), (60, 60, 5, 5)]
+        plan = planner.plan(windows)
+        self.assertEqual(
+            sorted(plan), [((0, 0, 20, 10), [0, 1]), ((60, 60, 5, 5), [2])]
+        )
+
+        arrays = planner.read(dataset, windows)
+        for (offset_x, offset_y, size_x, size_y), array in zip(windows, arrays):
+            np.testing.assert_array_equal(
+                array,
+                data[:, offset_y:offset_y + size_y, offset_x:offset_x + size_x]
+            )
+
+    def test_waste(self):
+        from pygdal.planner import ReadPlanner
+
+        # the merged box would be half empty
+        windows = [(0, 0, 10, 10), (10, 10, 10, 10)]
+        self.assertEqual(len(ReadPlanner(waste=0.25).plan(windows)), 2)
+        self.assertEqual(
+            ReadPlanner(waste=0.5).plan(windows), [((0, 0, 20, 20), [0, 1])]
+        )
+
+    def test_plan_covers_windows(self):
+        from pygdal.planner import ReadPlanner
+
+        rng = random.Random(42)
+        windows = [
+            (rng.randrange(1000), rng.randrange(1000),
+             rng.randrange(1, 20), rng.randrange(1, 20))
+            for _ in range(2000)
+        ]
+        plan = ReadPlanner(gap=4).plan(windows)
+        self.assertLess(len(plan), len(windows))
+        self.assertEqual(
+            sorted(index for _, indices in plan for index in indices),
+            list(range(len(windows)))
+        )
+        for (offset_x, offset_y, size_x, size_y), indices in plan:
+            for index in indices:
+                x, y, width, height = windows[index]
+                self.assertTrue(
+                    offset_x <= x and x + width <= offset_x + size_x
+                    and offset_y <= y and y + height <= offset_y + size_y
+                )
+
+
+class TestPropertyCaching(unittest.TestCase):
+    def test_property_caching(self):
+        dataset, _ = create_mem()
+        self.assertIs(dataset.geotransform, dataset.geotransform)
+        dataset.geotransform = (1, 2, 0, 3, 0, -2)
+        self.assertEqual(dataset.geotransform, (1, 2, 0, 3, 0, -2))
+        self.assertEqual(dataset.extent, (1, -157, 201, 3))
+
+    def test_projection_invalidation(self):
+        dataset, _ = create_mem()
+        self.assertEqual(dataset.projection, "")
+        self.assertIs(dataset.projection, dataset.projection)
+        dataset.projection = 'LOCAL_CS["x"]'
+        self.assertIn('LOCAL_CS["x"', dataset.projection)
+
+
+class TestLazyLoading(unittest.TestCase):
+    def test_functions_bound_after_load(self):
+        import pygdal.gdal
+        from pygdal.libgdal import _LazyFunction
+
+        create_mem()
+        self.assertNotIsInstance(pygdal.gdal.GDALClose, _LazyFunction)
+        self.assertNotIsInstance(pygdal.gdal.GDALRasterIOEx, _LazyFunction)
+
+
+class TestPool(TempDirTestCase):
+    def test_checkout_and_evict(self):
+        from pygdal.pool import DatasetPool
+
+        paths = [self.path("pool_%d.tif" % index) for index in range(3)]
+        for path in paths:
+            create_tiff(path, 10, 10, 1)
+
+        pool = DatasetPool(max_open=2)
+        for path in paths + paths[:1]:
+            with pool.checkout(path) as dataset:
+                self.assertEqual(dataset.size, (10, 10))
+        with pool.checkout(paths[0]):
+            pass
+        stats = pool.stats
+        self.assertEqual(stats["open"], 2)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["evictions"], 2)
+        pool.close()
+        self.assertRaises(ValueError, pool.acquire, paths[0])
+
+
+class TestAsyncReader(TempDirTestCase):
+    def test_regions(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("async.tif")
+        data = create_tiff(path)
+        with Dataset.open(path) as dataset:
+            with dataset.async_reader(bands=[1, 2]) as reader:
+                regions = list(reader)
+            self.assertTrue(regions)
+            np.testing.assert_array_equal(reader.array, data)
+
+    def test_not_started(self):
+        from pygdal.gdal import Dataset
+
+        path = self.path("async.tif")
+        create_tiff(path)
+        with Dataset.open(path) as dataset:
+            reader = dataset.async_reader(bands=[1, 2])
+            self.assertRaises(ValueError, iter, reader)
+
+
+class TestErrors(unittest.TestCase):
+    def test_error_message_decoded(self):
+        from pygdal.gdal import Dataset
+
+        with self.assertRaises(IOError) as context:
+            Dataset.open("/nonexistent/raster.tif")
+        self.assertIsInstance(context.exception.args[0], str)
+        self.assertIn("raster.tif", context.exception.args[0])
+
+
+class TestMaskedReads(unittest.TestCase):
+    def test_masked_read(self):
+        dataset, data = create_mem(count=2, size_x=10, size_y=10)
+        dataset.bands[1].nodata = 5
+        masked = dataset.bands[1].read(mask=True)
+        self.assertIsInstance(masked, np.ma.MaskedArray)
+        self.assertEqual(masked.mask.sum(), 1)
+        self.assertTrue(masked.mask[0, 5])
+
+        self.assertIs(dataset.bands[2].read(mask=True).mask, np.ma.nomask)
+
+        masked = dataset.read(mask=True)
+        self.assertEqual(masked.mask.sum(), 1)
+        self.assertTrue(masked.mask[0, 0, 5])
+
+
+class TestCopy(TempDirTestCase):
+    def test_create_copy_with_options_and_progress(self):
+        from pygdal.gdal import Dataset, Driver
+
+        source, data = create_mem()
+        path = self.path("copy.tif")
+        progress = []
+        with Driver.by_name("GTiff").create_copy(
+                path, source, options={"TILED": True, "COMPRESS": "LZW"},
+                progress=lambda complete, message: progress.append(complete)):
+            pass
+        self.assertEqual(progress[-1], 1.0)
+
+        with Dataset.open(path) as dataset:
+            self.assertEqual(dataset.bands[1].block_size, (256, 256))
+            self.assertEqual(
+                dataset.metadata_item("COMPRESSION", "IMAGE_STRUCTURE"), "LZW"
+            )
+            np.testing.assert_array_equal(dataset.read(), data)
+
+        self.assertRaises(
+            Exception, Driver.by_name("GTiff").create_copy,
+            self.path("cancelled.tif"), source,
+            progress=lambda complete, message: False
+        )
+
+    def test_copy_to(self):
+        source, data = create_mem()
+        target, _ = create_mem()
+        target.write(np.zeros_like(data))
+        source.copy_to(target)
+        np.testing.assert_array_equal(target.read(), data)
+
+        target.write(np.zeros_like(data))
+        source.bands[2].copy_to(target.bands[1])
+        np.testing.assert_array_equal(target.bands[1].read(), data[1])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
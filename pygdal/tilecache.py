@@ -0,0 +1,118 @@
+""" A cache of decoded raster windows.
+"""
+
+from collections import OrderedDict
+import threading
+import weakref
+
+
+# all caches, so that writes can invalidate the entries of a dataset
+_caches = weakref.WeakSet()
+
+
+def invalidate(source):
+    """ Drops the entries of the given source from all caches.
+    """
+    for cache in list(_caches):
+        cache.invalidate(source)
+
+
+class TileCache(object):
+    """ Least recently used cache of decoded arrays, bounded by the total
+        number of bytes of the cached arrays. The cached arrays are made
+        read-only, as they are shared between all readers. The cache is safe
+        to use from several threads.
+
+        Entries can be put with a `source`, e.g. the handle of the dataset
+        they were read from, to drop all of them at once with `invalidate`.
+        Bands and datasets do so whenever they are written to or closed.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        # arrays by key, and the keys by their source
+        self._entries = OrderedDict()
+        self._sources = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches.add(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """ Returns the cached array for the key or None, and marks it as the
+            most recently used one.
+        """
+        with self._lock:
+            try:
+                entry = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, array, source=None):
+        """ Adds an array to the cache and evicts the least recently used
+            arrays until the cache is within its budget. Arrays larger than
+            the whole budget are not cached.
+        """
+        array.flags.writeable = False
+        if array.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (array, source)
+            self._sources.setdefault(source, set()).add(key)
+            self.bytes += array.nbytes
+
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        # drops an entry, the lock must be held
+        try:
+            array, source = self._entries.pop(key)
+        except KeyError:
+            return
+        self.bytes -= array.nbytes
+        keys = self._sources[source]
+        keys.discard(key)
+        if not keys:
+            del self._sources[source]
+
+    def invalidate(self, source):
+        """ Drops all entries put with the given source.
+        """
+        with self._lock:
+            for key in list(self._sources.get(source, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sources.clear()
+            self.bytes = 0
+
+    @property
+    def stats(self):
+        """ A dict with the hit, miss and eviction counters and the current
+            size of the cache.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
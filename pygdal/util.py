@@ -1,13 +1,44 @@
+from math import floor, ceil
+from functools import wraps
+
+import numpy as np
+
+
 
 
 class ManagedObject(object):
     def __init__(self, handle):
         self._handle = handle
+        self._property_cache = {}
 
     @property
     def _as_parameter_(self):
         return self._handle
 
+    def _invalidate(self, *names):
+        """ Drops the given, or all cached property values.
+        """
+        if not names:
+            self._property_cache.clear()
+        for name in names:
+            self._property_cache.pop(name, None)
+
+
+def cached(getter):
+    """ Decorator for property getters of `ManagedObject` subclasses to cache
+        their value. Setters of mutable properties must invalidate it.
+    """
+    name = getter.__name__
+
+    @wraps(getter)
+    def wrapper(self):
+        try:
+            return self._property_cache[name]
+        except KeyError:
+            value = self._property_cache[name] = getter(self)
+            return value
+    return wrapper
+
 
 
 class Window(tuple):
@@ -18,6 +49,10 @@ class Window(tuple):
                 raise ValueError
         return obj
 
+    def __getnewargs__(self):
+        # tuple subclasses are unpickled with the tuple as single argument
+        return tuple(self)
+
     offset_x = property(lambda self: self[0])
     offset_y = property(lambda self: self[1])
     size_x = property(lambda self: self[2])
@@ -51,6 +86,20 @@ class Window(tuple):
         return cls(offset_x, offset_y, size_x, size_y)
 
 
+def block_windows(size_x, size_y, block_size_x, block_size_y):
+    """ Yields the windows of a block grid over a raster of the given size in
+        row major order. Blocks on the right and bottom edges are clipped to
+        the raster size.
+    """
+    for offset_y in range(0, size_y, block_size_y):
+        for offset_x in range(0, size_x, block_size_x):
+            yield Window(
+                offset_x, offset_y,
+                min(block_size_x, size_x - offset_x),
+                min(block_size_y, size_y - offset_y)
+            )
+
+
 class Extent(tuple):
     def __new__(cls, min_x, min_y, max_x, max_y):
         assert(min_x <= max_x)
@@ -72,3 +121,110 @@ class Extent(tuple):
             min(x1, x2), min(y1, y2),
             max(x1, x2), max(y1, y2),
         )
+
+
+class GeoTransform(tuple):
+    """ An affine transformation from pixel/line to georeferenced coordinates
+        in the GDAL geotransform layout. All transformations are vectorized
+        and accept scalars or arrays of coordinates.
+    """
+
+    def __new__(cls, origin_x=0.0, pixel_size_x=1.0, rotation_x=0.0,
+                origin_y=0.0, rotation_y=0.0, pixel_size_y=1.0):
+        return super(GeoTransform, cls).__new__(cls, (
+            float(origin_x), float(pixel_size_x), float(rotation_x),
+            float(origin_y), float(rotation_y), float(pixel_size_y)
+        ))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    origin_x = property(lambda self: self[0])
+    pixel_size_x = property(lambda self: self[1])
+    rotation_x = property(lambda self: self[2])
+    origin_y = property(lambda self: self[3])
+    rotation_y = property(lambda self: self[4])
+    pixel_size_y = property(lambda self: self[5])
+
+    def forward(self, xs, ys):
+        """ Transforms pixel/line coordinates to georeferenced coordinates.
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        return (
+            self[0] + xs * self[1] + ys * self[2],
+            self[3] + xs * self[4] + ys * self[5]
+        )
+
+    def inverse(self, xs, ys):
+        """ Transforms georeferenced coordinates to pixel/line coordinates.
+        """
+        return self.inverted().forward(xs, ys)
+
+    def inverted(self):
+        """ Returns the inverse transformation, as GDALInvGeoTransform.
+        """
+        try:
+            return self.__dict__["_inverted"]
+        except KeyError:
+            pass
+
+        det = self[1] * self[5] - self[2] * self[4]
+        if abs(det) < 1e-15:
+            raise ValueError("The geotransform is not invertible.")
+        inv_det = 1.0 / det
+
+        inverted = GeoTransform(
+            (self[2] * self[3] - self[0] * self[5]) * inv_det,
+            self[5] * inv_det,
+            -self[2] * inv_det,
+            (-self[1] * self[3] + self[0] * self[4]) * inv_det,
+            -self[4] * inv_det,
+            self[1] * inv_det
+        )
+        self.__dict__["_inverted"] = inverted
+        return inverted
+
+    def compose(self, other):
+        """ Returns the transformation applying this one and then `other`, as
+            GDALComposeGeoTransforms.
+        """
+        return GeoTransform(
+            other[1] * self[0] + other[2] * self[3] + other[0],
+            other[1] * self[1] + other[2] * self[4],
+            other[1] * self[2] + other[2] * self[5],
+            other[4] * self[0] + other[5] * self[3] + other[3],
+            other[4] * self[1] + other[5] * self[4],
+            other[4] * self[2] + other[5] * self[5]
+        )
+
+    def window(self, min_x, min_y, max_x, max_y, size=None):
+        """ Returns the smallest window covering the georeferenced extent. If
+            the raster `size` is given, the window is clipped to it.
+        """
+        pixels, lines = self.inverse(
+            [min_x, max_x, min_x, max_x], [min_y, min_y, max_y, max_y]
+        )
+        # the small epsilon avoids growing windows due to rounding errors
+        offset_x = int(floor(pixels.min() + 1e-9))
+        offset_y = int(floor(lines.min() + 1e-9))
+        end_x = int(ceil(pixels.max() - 1e-9))
+        end_y = int(ceil(lines.max() - 1e-9))
+
+        if size is not None:
+            offset_x, end_x = max(offset_x, 0), min(end_x, size[0])
+            offset_y, end_y = max(offset_y, 0), min(end_y, size[1])
+
+        return Window(
+            offset_x, offset_y, max(end_x - offset_x, 0), max(end_y - offset_y, 0)
+        )
+
+    def extent(self, window):
+        """ Returns the georeferenced extent covered by the window.
+        """
+        offset_x, offset_y, size_x, size_y = window
+        xs, ys = self.forward(
+            [offset_x, offset_x + size_x, offset_x, offset_x + size_x],
+            [offset_y, offset_y, offset_y + size_y, offset_y + size_y]
+        )
+        return Extent(xs.min(), ys.min(), xs.max(), ys.max())
@@ -0,0 +1,151 @@
+""" Zonal statistics of a value band grouped by a co-registered label band.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from pygdal.stats import map_windows
+
+
+ZonalStatistics = namedtuple(
+    "ZonalStatistics", ["labels", "count", "sum", "mean", "min", "max", "std"]
+)
+
+
+# the values of the statistics of labels without values
+_EMPTY = (0, 0.0, 0.0, 0.0, np.inf, -np.inf)
+
+
+def _spread(labels, union, statistics):
+    # spreads the statistics of the sorted labels onto the sorted union
+    index = np.searchsorted(union, labels)
+    spread = []
+    for values, empty in zip(statistics, _EMPTY):
+        array = np.full(len(union), empty, dtype=values.dtype)
+        array[index] = values
+        spread.append(array)
+    return spread
+
+
+class ZonalAccumulator(object):
+    """ Accumulates the count, sum, minimum, maximum, mean and variance of
+        values per integer label. The statistics are kept for the distinct
+        labels seen, in sorted order, so large and sparse labels such as
+        polygon ids are cheap. Accumulators of separate parts can be merged.
+    """
+
+    def __init__(self):
+        self.labels = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.sum = np.zeros(0)
+        self.mean = np.zeros(0)
+        self.m2 = np.zeros(0)
+        self.min = np.zeros(0)
+        self.max = np.zeros(0)
+
+    def update(self, labels, values):
+        """ Adds the values with their labels, both flat arrays.
+        """
+        if not labels.size:
+            return
+        unique, inverse = np.unique(labels, return_inverse=True)
+        inverse = inverse.ravel()
+        size = len(unique)
+        values = values.astype(np.float64)
+
+        count = np.bincount(inverse, minlength=size)
+        sums = np.bincount(inverse, weights=values, minlength=size)
+        mean = sums / count
+        m2 = np.bincount(
+            inverse, weights=np.square(values - mean[inverse]), minlength=size
+        )
+        minimum = np.full(size, np.inf)
+        np.minimum.at(minimum, inverse, values)
+        maximum = np.full(size, -np.inf)
+        np.maximum.at(maximum, inverse, values)
+
+        self._merge(unique, count, sums, mean, m2, minimum, maximum)
+
+    def merge(self, other):
+        """ Adds the values accumulated by another instance.
+        """
+        self._merge(
+            other.labels, other.count, other.sum, other.mean, other.m2,
+            other.min, other.max
+        )
+
+    def _merge(self, labels, count, sums, mean, m2, minimum, maximum):
+        statistics = (count, sums, mean, m2, minimum, maximum)
+        if not np.array_equal(labels, self.labels):
+            union = np.union1d(self.labels, labels)
+            own = (self.count, self.sum, self.mean, self.m2, self.min, self.max)
+            (self.count, self.sum, self.mean, self.m2, self.min,
+             self.max) = _spread(self.labels, union, own)
+            self.labels = union
+            statistics = _spread(labels, union, statistics)
+        count, sums, mean, m2, minimum, maximum = statistics
+
+        total = self.count + count
+        # the weight of the merged part, with parallel Welford updates
+        weight = count / np.maximum(total, 1).astype(np.float64)
+        delta = mean - self.mean
+
+        self.mean += delta * weight
+        self.m2 += m2 + np.square(delta) * self.count * weight
+        self.sum += sums
+        self.count = total
+        np.minimum(self.min, minimum, out=self.min)
+        np.maximum(self.max, maximum, out=self.max)
+
+    def result(self):
+        """ Returns the statistics of all labels with at least one value.
+        """
+        return ZonalStatistics(
+            self.labels, self.count, self.sum, self.mean, self.min, self.max,
+            np.sqrt(self.m2 / self.count)
+        )
+
+
+def _block_zonal_statistics(bands, window):
+    values_band, labels_band = bands
+    values = values_band.read(*window)
+    labels = labels_band.read(*window)
+
+    valid = np.ones(values.shape, dtype=bool)
+    for band, data in ((values_band, values), (labels_band, labels)):
+        band_valid = band._valid(window, data)
+        if band_valid is not None:
+            valid &= band_valid
+    if values.dtype.kind == "f":
+        valid &= ~np.isnan(values)
+
+    labels = labels[valid].astype(np.int64)
+    values = values[valid]
+    # negative labels are not zones
+    zones = labels >= 0
+
+    accumulator = ZonalAccumulator()
+    accumulator.update(labels[zones], values[zones])
+    return accumulator
+
+
+def zonal_statistics(values, labels, workers=None):
+    """ Computes the count, sum, mean, minimum, maximum and standard
+        deviation of the `values` band per label of the co-registered
+        `labels` band. Both bands are streamed in lockstep over the natural
+        blocks of the values band, honouring their masks and nodata values.
+        Negative labels are ignored. With `workers`, the blocks are processed
+        in that many threads and their results merged.
+    """
+    if values.size != labels.size:
+        raise ValueError("The values and labels bands differ in size.")
+
+    total = ZonalAccumulator()
+    blocks = map_windows(
+        _block_zonal_statistics, [values, labels], values.block_windows(),
+        workers
+    )
+    for accumulator in blocks:
+        total.merge(accumulator)
+    return total.result()
@@ -1,4 +1,4 @@
-from distutils.core import setup
+from setuptools import setup
 setup(
     name='pygdal',
     version='0.0.1dev',
@@ -8,6 +8,8 @@ setup(
     author_email='fabian.schindler@eox.at',
     url='https://github.com/constantinius/pygdal',
     packages=['pygdal'],
+    install_requires=['numpy'],
+    python_requires='>=3.8',
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "Intended Audience :: Developers",
@@ -17,7 +19,8 @@ setup(
         "Natural Language :: English",
         "Operating System :: OS Independent",
         "Programming Language :: Python",
-        "Programming Language :: Python :: 2",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
         "Topic :: Scientific/Engineering",
         "Topic :: Scientific/Engineering :: GIS"
     ]